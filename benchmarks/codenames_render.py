@@ -0,0 +1,272 @@
+"""Render time of a full codenames game per preset and encoding time and size per image format.
+
+Every field is drawn from scratch like before :class:`~bot.core.codenames.generation.FieldRenderer`
+and repainted from sprites, and both are checked to be identical.
+
+Run from the repository root with ``PYTHONPATH=src python benchmarks/codenames_render.py``.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Iterable, Sequence
+from io import BytesIO
+
+from PIL import Image, ImageChops, ImageDraw
+
+from bot.core.codenames.constants import Colors, FieldSizing, image_formats
+from bot.core.codenames.generation import FieldRenderer, encode, words
+
+
+def draw_field(
+    team1_words: Iterable[str],
+    team2_words: Iterable[str],
+    endgame_word: str,
+    no_team_words: Iterable[str],
+    opened_words: Iterable[str],
+    order: Sequence[str],
+    sizing: FieldSizing,
+) -> tuple[Image.Image, Image.Image]:
+    """Draws captain and player fields from scratch, shape by shape.
+
+    This is how fields were drawn before :class:`FieldRenderer`, the benchmark checks that both
+    produce identical images.
+
+    :param team1_words: Red cards
+    :param team2_words: Blue cards
+    :param endgame_word: Black card
+    :param no_team_words: White cards
+    :param opened_words: "Used" words
+    :param order: Order that the words should be displayed in
+    :param sizing: Size of the field
+    :return: Captain and player field images
+    """
+    img = Image.new("RGB", (sizing.width, sizing.height), Colors.background)
+    draw = ImageDraw.Draw(img)
+
+    # Drawing two bottom rectangles with left words counter
+    draw.rectangle(
+        xy=(
+            0,
+            sizing.height - sizing.footer_height,
+            sizing.width / 2 - 1,
+            sizing.height - 1,
+        ),
+        fill=Colors.red_fill,
+    )
+    red_words_left = 0
+    for word in team1_words:
+        if word not in opened_words:
+            red_words_left += 1
+    draw.text(
+        xy=(sizing.width / 4, sizing.height - sizing.footer_height / 2),
+        text=str(red_words_left),
+        fill=Colors.red_font,
+        font=sizing.big_font,
+        anchor=FieldSizing.text_anchor,
+    )
+
+    draw.rectangle(
+        xy=(
+            sizing.width / 2,
+            sizing.height - sizing.footer_height,
+            sizing.width - 1,
+            sizing.height - 1,
+        ),
+        fill=Colors.blue_fill,
+    )
+    blue_words_left = 0
+    for word in team2_words:
+        if word not in opened_words:
+            blue_words_left += 1
+    draw.text(
+        xy=(
+            sizing.width / 2 + sizing.width / 4,
+            sizing.height - sizing.footer_height / 2,
+        ),
+        text=str(blue_words_left),
+        fill=Colors.blue_font,
+        font=sizing.big_font,
+        anchor=FieldSizing.text_anchor,
+    )
+
+    # Creating two separate images for two fields
+    cap_img = img.copy()
+    cap_draw = ImageDraw.Draw(cap_img)
+    pl_img = img.copy()
+    pl_draw = ImageDraw.Draw(pl_img)
+
+    fill_col: tuple[int, int, int] = Colors.neutral_fill
+    outline_col: tuple[int, int, int] = Colors.neutral_outline
+    font_col: tuple[int, int, int] = Colors.neutral_font
+
+    # Filling the captain's field
+    for x in range(sizing.card_count):
+        for y in range(sizing.card_count):
+            word = order[x * sizing.card_count + y]
+            if word in team1_words:
+                if word in opened_words:
+                    fill_col = Colors.red_opened_fill
+                    outline_col = Colors.red_opened_fill
+                    font_col = Colors.red_opened_font
+                else:
+                    fill_col = Colors.red_fill
+                    outline_col = Colors.red_fill
+                    font_col = Colors.red_font
+            elif word in team2_words:
+                if word in opened_words:
+                    fill_col = Colors.blue_opened_fill
+                    outline_col = Colors.blue_opened_fill
+                    font_col = Colors.blue_opened_font
+                else:
+                    fill_col = Colors.blue_fill
+                    outline_col = Colors.blue_fill
+                    font_col = Colors.blue_font
+            elif word == endgame_word:
+                if word in opened_words:
+                    fill_col = Colors.black_opened_fill
+                    outline_col = Colors.black_opened_fill
+                    font_col = Colors.black_opened_font
+                else:
+                    fill_col = Colors.black_fill
+                    outline_col = Colors.black_fill
+                    font_col = Colors.black_font
+            elif word in no_team_words:
+                if word in opened_words:
+                    fill_col = Colors.neutral_opened_cap_fill
+                    outline_col = Colors.neutral_opened_cap_outline
+                    font_col = Colors.neutral_opened_cap_font
+                else:
+                    fill_col = Colors.neutral_fill
+                    outline_col = Colors.neutral_outline
+                    font_col = Colors.neutral_font
+
+            cap_draw.rounded_rectangle(
+                xy=(
+                    sizing.card_spacing * (x + 1) + sizing.card_width * x,
+                    sizing.card_spacing * (y + 1) + sizing.card_height * y,
+                    (sizing.card_spacing + sizing.card_width) * (x + 1),
+                    (sizing.card_spacing + sizing.card_height) * (y + 1),
+                ),
+                radius=sizing.card_radius,
+                fill=fill_col,
+                outline=outline_col,
+                width=sizing.card_outline_width,
+            )
+
+            cap_draw.text(
+                xy=(
+                    sizing.card_spacing * (x + 1) + sizing.card_width * x + sizing.card_width / 2,
+                    sizing.card_spacing * (y + 1) + sizing.card_height * y + sizing.card_height / 2,
+                ),
+                text=str(word).upper(),
+                fill=font_col,
+                font=sizing.font,
+                anchor=FieldSizing.text_anchor,
+            )
+
+    # Filling the players' field
+    for x in range(sizing.card_count):
+        for y in range(sizing.card_count):
+            word = order[x * sizing.card_count + y]
+            if word in opened_words:
+                if word in team1_words:
+                    fill_col = Colors.red_fill
+                    outline_col = Colors.red_fill
+                    font_col = Colors.red_font
+                elif word in team2_words:
+                    fill_col = Colors.blue_fill
+                    outline_col = Colors.blue_fill
+                    font_col = Colors.blue_font
+                elif word == endgame_word:
+                    fill_col = Colors.black_fill
+                    outline_col = Colors.black_fill
+                    font_col = Colors.black_font
+                elif word in no_team_words:
+                    fill_col = Colors.neutral_opened_pl_fill
+                    outline_col = Colors.neutral_opened_pl_outline
+                    font_col = Colors.neutral_opened_pl_font
+            else:
+                fill_col = Colors.neutral_fill
+                outline_col = Colors.neutral_outline
+                font_col = Colors.neutral_font
+
+            pl_draw.rounded_rectangle(
+                xy=(
+                    sizing.card_spacing * (x + 1) + sizing.card_width * x,
+                    sizing.card_spacing * (y + 1) + sizing.card_height * y,
+                    (sizing.card_spacing + sizing.card_width) * (x + 1),
+                    (sizing.card_spacing + sizing.card_height) * (y + 1),
+                ),
+                radius=sizing.card_radius,
+                fill=fill_col,
+                outline=outline_col,
+                width=sizing.card_outline_width,
+            )
+
+            pl_draw.text(
+                xy=(
+                    sizing.card_spacing * (x + 1) + sizing.card_width * x + sizing.card_width / 2,
+                    sizing.card_spacing * (y + 1) + sizing.card_height * y + sizing.card_height / 2,
+                ),
+                text=str(word).upper(),
+                fill=font_col,
+                font=sizing.font,
+                anchor=FieldSizing.text_anchor,
+            )
+
+    return cap_img, pl_img
+
+
+def main() -> None:
+    team_red_words, team_blue_words, endgame_word, no_team_words, available_words = asyncio.run(
+        words("std")
+    )
+
+    order = available_words.copy()  # Has to be a list
+    random.shuffle(order)
+    order = tuple(order)
+    # A field is rendered at the start of the game and after every guess
+    moves = [order[:opened] for opened in range(len(order) + 1)]
+
+    for preset in FieldSizing.presets:
+        sizing = FieldSizing.preset(preset)
+        start = time.perf_counter()
+        expected = [
+            draw_field(
+                team_red_words, team_blue_words, endgame_word, no_team_words, opened, order, sizing
+            )
+            for opened in moves
+        ]
+        before = time.perf_counter() - start
+
+        renderer = FieldRenderer(
+            team_red_words, team_blue_words, endgame_word, no_team_words, order, sizing
+        )
+        timings = []
+        for opened, reference in zip(moves, expected, strict=True):
+            start = time.perf_counter()
+            fields = renderer.render(opened)
+            timings.append(time.perf_counter() - start)
+            for img, reference_img in zip(fields, reference, strict=True):
+                assert ImageChops.difference(img, reference_img).getbbox() is None
+        after = sum(timings)
+        per_guess = sum(timings[1:]) / (len(timings) - 1)
+
+        print(f"{preset}: {len(moves)} renders, identical output")
+        print(f"  drawing: {before * 1000:.0f}ms ({before / len(moves) * 1000:.1f}ms per render)")
+        print(f"  sprites: {after * 1000:.0f}ms (first {timings[0] * 1000:.1f}ms)")
+        print(f"  per guess: {per_guess * 1000:.2f}ms")
+
+        cap_img = renderer.render(moves[len(moves) // 2])[0]
+        for image_format in image_formats:
+            buffer = BytesIO()
+            start = time.perf_counter()
+            encode(cap_img, buffer, image_format)
+            elapsed = time.perf_counter() - start
+            size = buffer.tell() / 1024
+            print(f"  {image_format}: {elapsed * 1000:.1f}ms, {size:.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Build time and search latency of the wiki search index over the full wiki corpus.
+
+Run from the repository root with ``PYTHONPATH=src python benchmarks/search_index.py [raw base URL]``.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+import aiohttp
+
+from bot.core.search_help import WikiFetcher, WikiLine
+from bot.core.search_index import SearchIndex
+
+
+async def load_chunks(raw_base_url: str) -> dict[str, list[WikiLine]]:
+    async with aiohttp.ClientSession() as session:
+        fetcher = WikiFetcher(session)
+        fetcher.rawBaseURL = raw_base_url
+        await fetcher.alternativeWikiIndexing()
+        return fetcher.orderedChunks()
+
+
+def main() -> None:
+    chunks = asyncio.run(load_chunks(sys.argv[1] if len(sys.argv) > 1 else WikiFetcher.rawBaseURL))
+    start = time.perf_counter()
+    index = SearchIndex.empty().updated(chunks)
+    build = time.perf_counter() - start
+
+    queries = (
+        "youtube",
+        "anime",
+        "torrent",
+        "VPN",
+        "ai",
+        "movie streaming",
+        "manga reader",
+        "linux",
+        "adblock",
+        "free music download",
+    )
+    timings = []
+    for _ in range(20):
+        for query in queries:
+            start = time.perf_counter()
+            results = index.search(query)
+            timings.append(time.perf_counter() - start)
+            assert results == index.search(query), query
+
+    percentiles = statistics.quantiles(timings, n=100)
+    print(f"{len(index)} lines, built in {build * 1000:.2f}ms")
+    print(f"p50: {percentiles[49] * 1000:.2f}ms, p99: {percentiles[98] * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
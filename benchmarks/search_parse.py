@@ -0,0 +1,132 @@
+"""Parse time and retained memory of parseWikiChunk against the addPretext it replaced.
+
+Both are run over the full wiki corpus and checked to produce the same lines. Run from the
+repository root with ``PYTHONPATH=src python benchmarks/search_parse.py [raw base URL]``.
+"""
+
+import asyncio
+import sys
+import timeit
+import tracemalloc
+
+import aiohttp
+
+from bot.core.search_help import WikiFetcher, parseWikiChunk, wikiChunks
+
+
+def addPretext(lines, icon, baseURL, subURL):
+    modified_lines = []
+    currMdSubheading = ""
+    currSubCat = ""
+    currSubSubCat = ""
+
+    for line in lines:
+        if line.startswith("#"):  # Title Lines
+            if not subURL == "storage":
+                if line.startswith("# ►"):
+                    currMdSubheading = (
+                        "#"
+                        + line.replace("# ►", "")
+                        .strip()
+                        .replace(" / ", "--")
+                        .replace(" ", "-")
+                        .lower()
+                    )
+                    currSubCat = "/ " + line.replace("# ►", "").strip() + " "
+                    currSubSubCat = ""
+                elif line.startswith("## ▷"):
+                    if (
+                        not subURL == "non-english"
+                    ):  # Because non-eng section has multiple subsubcats with same names
+                        currMdSubheading = (
+                            "#"
+                            + line.replace("## ▷", "")
+                            .strip()
+                            .replace(" / ", "--")
+                            .replace(" ", "-")
+                            .lower()
+                        )
+                    currSubSubCat = "/ " + line.replace("## ▷", "").strip() + " "
+            elif subURL == "storage":
+                if line.startswith("## "):
+                    currMdSubheading = (
+                        "#"
+                        + line.replace("## ", "")
+                        .strip()
+                        .replace(" / ", "--")
+                        .replace(" ", "-")
+                        .lower()
+                    )
+                    currSubCat = "/ " + line.replace("## ", "").strip() + " "
+                    currSubSubCat = ""
+                elif line.startswith("### "):
+                    currMdSubheading = (
+                        "#"
+                        + line.replace("### ", "")
+                        .strip()
+                        .replace(" / ", "--")
+                        .replace(" ", "-")
+                        .lower()
+                    )
+                    currSubSubCat = "/ " + line.replace("### ", "").strip() + " "
+
+            # Remove links from subcategory titles (because the screw the format)
+            if "http" in currSubCat:
+                currSubCat = ""
+            if "http" in currSubSubCat:
+                currSubSubCat = ""
+
+        elif any(char.isalpha() for char in line):  # If line has content
+            preText = f"[{icon}{currSubCat}{currSubSubCat}]({baseURL}{subURL}{currMdSubheading}) ► "
+            if line.startswith("* "):
+                line = line[2:]
+            modified_lines.append(preText + line)
+
+    return modified_lines
+
+
+async def downloadCorpus(rawBaseURL):
+    async with aiohttp.ClientSession() as session:
+
+        async def download(fileName):
+            async with session.get(rawBaseURL + fileName) as response:
+                response.raise_for_status()
+                return (await response.text()).split("\n")
+
+        return await asyncio.gather(*(download(fileName) for fileName, _, _ in wikiChunks))
+
+
+def main():
+    corpus = asyncio.run(
+        downloadCorpus(sys.argv[1] if len(sys.argv) > 1 else WikiFetcher.rawBaseURL)
+    )
+    chunkArgs = [
+        (lines, icon, "https://fmhy.pages.dev/", fileName.replace(".md", "").lower())
+        for lines, (fileName, icon, _) in zip(corpus, wikiChunks)
+    ]
+
+    for args in chunkArgs:
+        assert addPretext(*args) == list(map(str, parseWikiChunk(*args))), args[3]
+
+    runs = 20
+    old = timeit.timeit(lambda: [addPretext(*args) for args in chunkArgs], number=runs) / runs
+    new = timeit.timeit(lambda: [list(parseWikiChunk(*args)) for args in chunkArgs], number=runs)
+    new /= runs
+
+    def retained(parse):
+        tracemalloc.start()
+        result = [parse(*args) for args in chunkArgs]  # noqa: F841
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size / 1024 / 1024
+
+    oldMemory = retained(addPretext)
+    newMemory = retained(lambda *args: list(parseWikiChunk(*args)))
+
+    print(f"{sum(map(len, corpus))} lines in {len(corpus)} chunks")
+    print(f"addPretext:     {old * 1000:.2f}ms, {oldMemory:.2f}MiB")
+    print(f"parseWikiChunk: {new * 1000:.2f}ms, {newMemory:.2f}MiB ({old / new:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
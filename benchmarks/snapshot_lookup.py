@@ -0,0 +1,51 @@
+"""Per-message duplicate check latency, rescanning the single page vs the precomputed URL set.
+
+Run from the repository root with ``PYTHONPATH=src python benchmarks/snapshot_lookup.py [page URL]``.
+"""
+
+import asyncio
+import random
+import sys
+import timeit
+
+import aiohttp
+
+from bot.core.config import url_regex
+from bot.core.snapshot import WikiSnapshot, parse_single_page
+from bot.core.urls import url_key
+
+
+async def download(url: str) -> str:
+    async with aiohttp.ClientSession() as session, session.get(url) as response:
+        response.raise_for_status()
+        return await response.text()
+
+
+def main() -> None:
+    page = asyncio.run(download(sys.argv[1] if len(sys.argv) > 1 else WikiSnapshot.url))
+    wiki_links = url_regex.findall(page)
+    messages = [
+        set(random.sample(wiki_links, 2)) | {("https", f"example{n}.com/not-in-the-wiki")}
+        for n in range(50)
+    ]
+
+    def before() -> None:
+        for message_links in messages:
+            set(url_regex.findall(page)).intersection(message_links)
+
+    _, urls = parse_single_page(page)
+
+    def after() -> None:
+        for message_links in messages:
+            {link for link in message_links if url_key(link) in urls}
+
+    parse = timeit.timeit(lambda: parse_single_page(page), number=1)
+    old = timeit.timeit(before, number=1) / len(messages)
+    new = timeit.timeit(after, number=1000) / 1000 / len(messages)
+    print(f"{len(page) / 1024 / 1024:.2f}MiB page, {len(urls)} unique URLs")
+    print(f"rescanning per message: {old * 1000:.3f}ms")
+    print(f"URL set per message:    {new * 1000:.3f}ms (parsed once in {parse * 1000:.2f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,12 @@
 import asyncio
-import os
 import random
 import re
-import shutil
+from io import BytesIO
 from typing import Literal, cast
-from uuid import uuid4 as get_uuid
 
 from discord import Embed, File, Guild, Interaction, Member, PartialMessageable, Role, User
 from discord.app_commands import Choice, choices, command, describe
+from discord.ext import commands
 from discord.ext.commands import GroupCog
 
 import bot.core.codenames.generation as gen
@@ -24,11 +23,18 @@ from bot.core.codenames.constants import (
     REACTION_ALPHABET,
     REACTION_R,
     Colors,
-    Paths,
+    FieldSizing,
 )
 from bot.core.codenames.messages import messages
+from bot.core.codenames.pool import RenderPool
 from bot.core.codenames.ui import StartView
-from bot.core.codenames.util import most_count_reaction_emojis, send_error, send_fields, vote
+from bot.core.codenames.util import (
+    most_count_reaction_emojis,
+    send_dm,
+    send_error,
+    send_fields,
+    vote,
+)
 
 
 # thanks owoer
@@ -45,6 +51,11 @@ def mock_user(n: int, bot: Bot) -> User:
 class Codenames(GroupCog, name="codenames"):
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
+        self.renders = RenderPool()
+
+    async def cog_unload(self) -> None:
+        self.renders.shutdown()
+        return await super().cog_unload()
 
     @command(name="start", description="Start a new game of codenames.")
     @is_codenames()
@@ -207,6 +218,20 @@ class Codenames(GroupCog, name="codenames"):
 
         await interaction.followup.send(embed=embed)
 
+    @commands.command(name="renderstats")
+    @commands.is_owner()
+    async def render_stats(self, ctx: commands.Context) -> None:
+        """Show how long codenames fields take to render in the worker pool."""
+        renders = self.renders
+        lines = [f"{renders.workers} workers, {renders.queue_depth()} queued"]
+        lines.extend(
+            f"{kind}: {stats.calls} renders, avg {stats.average_time * 1000:.0f}ms, "
+            f"max {stats.max_time * 1000:.0f}ms, avg wait {stats.average_wait * 1000:.0f}ms, "
+            f"max {stats.max_wait * 1000:.0f}ms"
+            for kind, stats in renders.stats.items()
+        )
+        await ctx.send("\n".join(lines))
+
     async def _build_team(
         self, channel: PartialMessageable, team: list[User | Member], color: str
     ) -> tuple[Member, list[Member]]:
@@ -274,8 +299,9 @@ class Codenames(GroupCog, name="codenames"):
         team1: list[User | Member],
         team2: list[User | Member],
         dictionary: str,
+        resolution: str,
+        image_format: str,
     ) -> None:
-        uuid = str(get_uuid())
 
         channel = self.bot.get_partial_messageable(
             interaction.channel_id,  # pyright: ignore[reportArgumentType]
@@ -342,6 +368,17 @@ class Codenames(GroupCog, name="codenames"):
         order = available_words.copy()  # Has to be a list
         random.shuffle(order)
         order = tuple(order)
+        renderer = await self.renders.submit(
+            "labels",
+            gen.FieldRenderer,
+            team_red_words,
+            team_blue_words,
+            endgame_word,
+            no_team_words,
+            order,
+            FieldSizing.preset(resolution),
+            image_format,
+        )
 
         if len(team_red_words) > len(team_blue_words):
             current_color = messages.game.red
@@ -364,25 +401,14 @@ class Codenames(GroupCog, name="codenames"):
 
         # Main game loop
         game_running = True
-        first_round = True
         send_field_to_caps = True
         while game_running:
-            gen.field(
-                team_red_words,
-                team_blue_words,
-                endgame_word,
-                no_team_words,
-                opened_words,
-                order,
-                uuid,
+            await self.renders.submit("field", renderer.field, tuple(opened_words))
+            await send_fields(
+                self.bot.rest, renderer, channel, current_cap, other_cap, send_field_to_caps
             )
-            await send_fields(uuid, channel, current_cap, other_cap, send_field_to_caps)
             send_field_to_caps = True
 
-            if first_round:
-                shutil.copy(Paths.cap_img(uuid), Paths.cap_img_init(uuid))
-                first_round = False
-
             await channel.send(
                 embed=Embed(
                     title=messages.game.waiting_title.format(current_color),
@@ -390,12 +416,14 @@ class Codenames(GroupCog, name="codenames"):
                     color=Colors.red if current_color == messages.game.red else Colors.blue,
                 )
             )
-            await current_cap.send(
+            await send_dm(
+                self.bot.rest,
+                current_cap,
                 embed=Embed(
                     title=messages.game.spy_move_request_title,
                     description=messages.game.spy_move_request_desc,
                     color=Colors.red if current_color == messages.game.red else Colors.blue,
-                )
+                ),
             )
 
             move_msg = await self.bot.wait_for(  # type: ignore
@@ -407,11 +435,13 @@ class Codenames(GroupCog, name="codenames"):
             move = move_msg.content
             word_count = int(move.split()[-1])
 
-            await current_cap.send(
+            await send_dm(
+                self.bot.rest,
+                current_cap,
                 embed=Embed(
                     title=messages.game.spy_move_accepted,
                     color=Colors.red if current_color == messages.game.red else Colors.blue,
-                )
+                ),
             )
             await channel.send(
                 embeds=[
@@ -470,15 +500,7 @@ class Codenames(GroupCog, name="codenames"):
 
                 opened_words.append(move)
                 available_words.remove(move)
-                gen.field(
-                    team_red_words,
-                    team_blue_words,
-                    endgame_word,
-                    no_team_words,
-                    opened_words,
-                    order,
-                    uuid,
-                )
+                await self.renders.submit("field", renderer.field, tuple(opened_words))
 
                 if move in no_team_words:
                     await move_msg.reply(
@@ -488,19 +510,23 @@ class Codenames(GroupCog, name="codenames"):
                             color=Colors.white,
                         )
                     )
-                    await current_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        current_cap,
                         embed=Embed(
                             title=messages.game.miss_title,
                             description=messages.game.miss_desc_no_team_dm.format(move),
                             color=Colors.white,
-                        )
+                        ),
                     )
-                    await other_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        other_cap,
                         embed=Embed(
                             title=messages.game.opponents_miss_title,
                             description=messages.game.opponents_miss_desc.format(move),
                             color=Colors.white,
-                        )
+                        ),
                     )
                     break
 
@@ -512,23 +538,27 @@ class Codenames(GroupCog, name="codenames"):
                             color=Colors.red if other_color == messages.game.red else Colors.blue,
                         )
                     )
-                    await current_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        current_cap,
                         embed=Embed(
                             title=messages.game.miss_title,
                             description=messages.game.miss_desc_other_team_dm.format(move),
                             color=Colors.red if other_color == messages.game.red else Colors.blue,
-                        )
+                        ),
                     )
-                    await other_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        other_cap,
                         embed=Embed(
                             title=messages.game.lucky_title,
                             description=messages.game.lucky_desc_your_team.format(move),
                             color=Colors.red if other_color == messages.game.red else Colors.blue,
-                        )
+                        ),
                     )
 
                     if set(other_words) <= set(opened_words):  # If all second_words are opened
-                        await send_fields(uuid, channel, current_cap, other_cap)
+                        await send_fields(self.bot.rest, renderer, channel, current_cap, other_cap)
 
                         await channel.send(
                             embed=Embed(
@@ -540,49 +570,57 @@ class Codenames(GroupCog, name="codenames"):
                             )
                         )
 
-                        await current_cap.send(
+                        await send_dm(
+                            self.bot.rest,
+                            current_cap,
                             embed=Embed(
                                 title=messages.game.your_team_lost_title,
                                 description=messages.game.your_team_lost_desc,
                                 color=Colors.red
                                 if other_color == messages.game.red
                                 else Colors.blue,
-                            )
+                            ),
                         )
                         await self.bot.db.increase_stats(current_cap.id, ("games", "games_cap"))
                         for player in current_pl:
-                            await player.send(
+                            await send_dm(
+                                self.bot.rest,
+                                player,
                                 embed=Embed(
                                     title=messages.game.your_team_lost_title,
                                     description=messages.game.your_team_lost_desc,
                                     color=Colors.red
                                     if other_color == messages.game.red
                                     else Colors.blue,
-                                )
+                                ),
                             )
                             await self.bot.db.increase_stats(player.id, ("games",))
 
-                        await other_cap.send(
+                        await send_dm(
+                            self.bot.rest,
+                            other_cap,
                             embed=Embed(
                                 title=messages.game.your_team_won_title,
                                 description=messages.game.your_team_won_desc,
                                 color=Colors.red
                                 if other_color == messages.game.red
                                 else Colors.blue,
-                            )
+                            ),
                         )
                         await self.bot.db.increase_stats(
                             other_cap.id, ("games", "games_cap", "wins", "wins_cap")
                         )
                         for player in other_pl:
-                            await player.send(
+                            await send_dm(
+                                self.bot.rest,
+                                player,
                                 embed=Embed(
                                     title=messages.game.your_team_won_title,
                                     description=messages.game.your_team_won_desc,
                                     color=Colors.red
                                     if other_color == messages.game.red
                                     else Colors.blue,
-                                )
+                                ),
                             )
                             await self.bot.db.increase_stats(player.id, ("games", "wins"))
 
@@ -598,22 +636,26 @@ class Codenames(GroupCog, name="codenames"):
                             color=Colors.black,
                         )
                     )
-                    await current_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        current_cap,
                         embed=Embed(
                             title=messages.game.miss_title,
                             description=messages.game.miss_desc_endgame_dm.format(move),
                             color=Colors.black,
-                        )
+                        ),
                     )
-                    await other_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        other_cap,
                         embed=Embed(
                             title=messages.game.lucky_title,
                             description=messages.game.lucky_desc_endgame.format(move),
                             color=Colors.black,
-                        )
+                        ),
                     )
 
-                    await send_fields(uuid, channel, current_cap, other_cap)
+                    await send_fields(self.bot.rest, renderer, channel, current_cap, other_cap)
 
                     await channel.send(
                         embed=Embed(
@@ -625,45 +667,53 @@ class Codenames(GroupCog, name="codenames"):
                         )
                     )
 
-                    await current_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        current_cap,
                         embed=Embed(
                             title=messages.game.your_team_lost_title,
                             description=messages.game.your_team_lost_desc,
                             color=Colors.red if other_color == messages.game.red else Colors.blue,
-                        )
+                        ),
                     )
                     await self.bot.db.increase_stats(current_cap.id, ("games", "games_cap"))
                     for player in current_pl:
-                        await player.send(
+                        await send_dm(
+                            self.bot.rest,
+                            player,
                             embed=Embed(
                                 title=messages.game.your_team_lost_title,
                                 description=messages.game.your_team_lost_desc,
                                 color=Colors.red
                                 if other_color == messages.game.red
                                 else Colors.blue,
-                            )
+                            ),
                         )
                         await self.bot.db.increase_stats(player.id, ("games",))
 
-                    await other_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        other_cap,
                         embed=Embed(
                             title=messages.game.your_team_won_title,
                             description=messages.game.your_team_won_desc,
                             color=Colors.red if other_color == messages.game.red else Colors.blue,
-                        )
+                        ),
                     )
                     await self.bot.db.increase_stats(
                         other_cap.id, ("games", "games_cap", "wins", "wins_cap")
                     )
                     for player in other_pl:
-                        await player.send(
+                        await send_dm(
+                            self.bot.rest,
+                            player,
                             embed=Embed(
                                 title=messages.game.your_team_won_title,
                                 description=messages.game.your_team_won_desc,
                                 color=Colors.red
                                 if other_color == messages.game.red
                                 else Colors.blue,
-                            )
+                            ),
                         )
                         await self.bot.db.increase_stats(player.id, ("games", "wins"))
 
@@ -677,23 +727,27 @@ class Codenames(GroupCog, name="codenames"):
                             color=Colors.red if current_color == messages.game.red else Colors.blue,
                         )
                     )
-                    await current_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        current_cap,
                         embed=Embed(
                             title=messages.game.success_title,
                             description=messages.game.success_desc_dm.format(move),
                             color=Colors.red if current_color == messages.game.red else Colors.blue,
-                        )
+                        ),
                     )
-                    await other_cap.send(
+                    await send_dm(
+                        self.bot.rest,
+                        other_cap,
                         embed=Embed(
                             title=messages.game.opponents_success_title,
                             description=messages.game.opponents_success_desc.format(move),
                             color=Colors.red if current_color == messages.game.red else Colors.blue,
-                        )
+                        ),
                     )
 
                     if set(current_words) <= set(opened_words):  # If all first_words are opened
-                        await send_fields(uuid, channel, current_cap, other_cap)
+                        await send_fields(self.bot.rest, renderer, channel, current_cap, other_cap)
 
                         await channel.send(
                             embed=Embed(
@@ -705,49 +759,57 @@ class Codenames(GroupCog, name="codenames"):
                             )
                         )
 
-                        await current_cap.send(
+                        await send_dm(
+                            self.bot.rest,
+                            current_cap,
                             embed=Embed(
                                 title=messages.game.your_team_won_title,
                                 description=messages.game.your_team_won_desc,
                                 color=Colors.red
                                 if current_color == messages.game.red
                                 else Colors.blue,
-                            )
+                            ),
                         )
                         await self.bot.db.increase_stats(
                             current_cap.id, ("games", "games_cap", "wins", "wins_cap")
                         )
                         for player in current_pl:
-                            await player.send(
+                            await send_dm(
+                                self.bot.rest,
+                                player,
                                 embed=Embed(
                                     title=messages.game.your_team_won_title,
                                     description=messages.game.your_team_won_desc,
                                     color=Colors.red
                                     if current_color == messages.game.red
                                     else Colors.blue,
-                                )
+                                ),
                             )
                             await self.bot.db.increase_stats(player.id, ("games", "wins"))
 
-                        await other_cap.send(
+                        await send_dm(
+                            self.bot.rest,
+                            other_cap,
                             embed=Embed(
                                 title=messages.game.your_team_lost_title,
                                 description=messages.game.your_team_lost_desc,
                                 color=Colors.red
                                 if current_color == messages.game.red
                                 else Colors.blue,
-                            )
+                            ),
                         )
                         await self.bot.db.increase_stats(other_cap.id, ("games", "games_cap"))
                         for player in other_pl:
-                            await player.send(
+                            await send_dm(
+                                self.bot.rest,
+                                player,
                                 embed=Embed(
                                     title=messages.game.your_team_lost_title,
                                     description=messages.game.your_team_lost_desc,
                                     color=Colors.red
                                     if current_color == messages.game.red
                                     else Colors.blue,
-                                )
+                                ),
                             )
                             await self.bot.db.increase_stats(player.id, ("games",))
 
@@ -757,7 +819,7 @@ class Codenames(GroupCog, name="codenames"):
                     if (
                         word_count > 0
                     ):  # If quitting after this move, field will be sent twice in a row
-                        await send_fields(uuid, channel, current_cap, other_cap)
+                        await send_fields(self.bot.rest, renderer, channel, current_cap, other_cap)
 
                 word_count -= 1
 
@@ -771,13 +833,12 @@ class Codenames(GroupCog, name="codenames"):
 
         # Sending initial captain filed to the guild text channel
         await channel.send(
-            file=File(Paths.cap_img_init(uuid), filename="initial_captain_field.png")
+            file=File(
+                BytesIO(renderer.initial_cap_file),
+                filename=f"initial_captain_field.{renderer.extension}",
+            )
         )
 
-        os.remove(Paths.pl_img(uuid))
-        os.remove(Paths.cap_img(uuid))
-        os.remove(Paths.cap_img_init(uuid))
-
 
 async def setup(bot: Bot) -> None:
     await bot.add_cog(Codenames(bot))
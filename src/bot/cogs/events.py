@@ -1,5 +1,5 @@
 import re
-import time
+from collections import OrderedDict
 from datetime import datetime
 
 import discord
@@ -14,6 +14,8 @@ from bot.core.config import (
     url_regex,
 )
 from bot.core.helpers import cembed
+from bot.core.scheduler import Priority
+from bot.core.urls import LinkIndex, url_key
 
 
 class Events(commands.Cog):
@@ -25,13 +27,16 @@ class Events(commands.Cog):
         self.bookmark_emoji = discord.PartialEmoji(name="🔖")
         self.del_emoji = discord.PartialEmoji(name="❌")
         self.list_emoji = discord.PartialEmoji(name="📋")
-        self.last_single_page_update = 0
-        self.single_page = ""
+        self.reaction_emojis = {self.bookmark_emoji, self.del_emoji, self.list_emoji}
+        # Messages fetched over REST because they were not in the gateway cache, newest last
+        self.fetched_messages: OrderedDict[int, discord.Message] = OrderedDict()
+        self.fetched_messages_size = 128
 
-        self.all_disallowed_messages = set()
+        self.all_disallowed_messages = LinkIndex()
         self.last_fetched_messages = {}
 
     async def cog_load(self) -> None:
+        await self.load_disallowed_links()
         self.update_single_page.start()
         self.update_disallowed_links.start()
         return await super().cog_load()
@@ -43,35 +48,58 @@ class Events(commands.Cog):
 
     @tasks.loop(minutes=5)
     async def update_single_page(self):
-        async with self.bot.session.get("https://api.fmhy.net/single-page") as response:
-            self.single_page = await response.text()
-            self.bot.logger.info("Updated single page cache.")
-            self.last_single_page_update = time.time()
+        await self.bot.snapshot.refresh()
 
-    @tasks.loop(minutes=10)
-    async def update_disallowed_links(self):
-        self.bot.logger.info("Ready")
+    async def load_disallowed_links(self):
+        """Restores the removed links index and channel cursors saved by previous runs."""
+        rows = await self.bot.db.fetch(
+            "SELECT message_id, protocol, link, jump_url FROM removed_links ORDER BY message_id",
+            fetchall=True,
+        )
+        for message_id, protocol, link, jump_url in rows:
+            self.all_disallowed_messages.add(message_id, (protocol, link), jump_url)
+        self.last_fetched_messages = dict(
+            await self.bot.db.fetch(
+                "SELECT channel_id, message_id FROM channel_cursors", fetchall=True
+            )
+        )
+        self.bot.logger.info(
+            f"Loaded {len(rows)} removed links, cursors for {len(self.last_fetched_messages)} channels"
+        )
 
+    def index_disallowed_links(
+        self, message_id: int, content: str, jump_url: str
+    ) -> list[tuple[int, str, str, str]]:
+        """Adds the links of a removed-sites message to the index.
+
+        :return: Rows of the new links, to store with ``save_removed_links``
+        """
+        return [
+            (message_id, *link, jump_url)
+            for link in set(re.findall(url_regex, content))
+            if self.all_disallowed_messages.add(message_id, link, jump_url)
+        ]
+
+    # New messages are ingested as they arrive in on_message, this only catches up on what the
+    # gateway missed (restarts, reconnects)
+    @tasks.loop(hours=1)
+    async def update_disallowed_links(self):
         for channel_id in disallowed_channel_ids:
-            self.bot.logger.info(f"Checking {channel_id}")
             channel = self.bot.get_channel(channel_id)
-            self.bot.logger.info(f"Channel: {channel.name}")
             if channel:
                 messages = await self.fetch_new_messages(channel_id)
-                total_links_added = 0
+                rows = []
                 for message in messages:
-                    msg_links = set(
-                        re.findall(
-                            url_regex,
-                            message.content,
-                        )
+                    rows.extend(
+                        self.index_disallowed_links(message.id, message.content, message.jump_url)
+                    )
+                if messages:
+                    await self.bot.db.save_removed_links(
+                        channel_id, rows, self.last_fetched_messages[channel_id]
                     )
-                    for link in msg_links:
-                        self.all_disallowed_messages.add((link, message.jump_url))
-                    total_links_added += len(msg_links)
 
-                if total_links_added > 0:
-                    self.bot.logger.info(f"Added {total_links_added} links from {channel_id}")
+                if rows:
+                    self.bot.logger.info(f"Added {len(rows)} missed links from {channel.name}")
 
     @update_disallowed_links.before_loop
     async def update_disallowed_links_before_loop(self):
@@ -82,19 +110,24 @@ class Events(commands.Cog):
         last_fetched_message_id = self.last_fetched_messages.get(channel_id)
 
         messages = []
-        fetch_limit = 200
+        # One history request per page, each goes through the scheduler as background work
+        fetch_limit = 100
         has_more_messages = True
 
+        async def fetch_page(after: int | None) -> list[discord.Message]:
+            return [
+                msg
+                async for msg in channel.history(
+                    limit=fetch_limit,
+                    after=discord.Object(after) if after else None,
+                    oldest_first=True,
+                )
+            ]
+
         while has_more_messages:
-            batch = []
-            async for msg in channel.history(
-                limit=fetch_limit,
-                after=(
-                    discord.Object(last_fetched_message_id) if last_fetched_message_id else None
-                ),
-                oldest_first=True,
-            ):
-                batch.append(msg)
+            batch = await self.bot.rest.submit(
+                Priority.LOW, "history", fetch_page(last_fetched_message_id)
+            )
 
             if batch:
                 messages.extend(batch)
@@ -108,17 +141,24 @@ class Events(commands.Cog):
 
         return messages
 
-    async def get_duplicate_non_duplicate_links(self, message_links):
-        if time.time() - self.last_single_page_update >= 300:
-            await self.update_single_page()
-
-        wiki_links = set(
-            re.findall(
-                url_regex,
-                self.single_page,
+    @commands.command(name="reststats")
+    @commands.is_owner()
+    async def rest_stats(self, ctx: commands.Context):
+        """Show how long outbound REST calls wait in the scheduler."""
+        rest = self.bot.rest
+        depth = rest.queue_depth()
+        await ctx.send(
+            "\n".join(
+                f"{priority.name}: {depth[priority]} queued, {stats.calls} calls, "
+                f"avg wait {stats.average_wait * 1000:.0f}ms, max {stats.max_wait * 1000:.0f}ms"
+                for priority, stats in rest.stats.items()
             )
         )
-        duplicate_links = wiki_links.intersection(message_links)
+
+    async def get_duplicate_non_duplicate_links(self, message_links):
+        wiki_urls = (await self.bot.snapshot.get()).urls
+
+        duplicate_links = {link for link in message_links if url_key(link) in wiki_urls}
         non_duplicate_links = message_links - duplicate_links
 
         return duplicate_links, non_duplicate_links
@@ -157,6 +197,11 @@ class Events(commands.Cog):
                 reason="Auto thread created by FMHY Bot",
             )
 
+        if message.channel.id in disallowed_channel_ids and (
+            rows := self.index_disallowed_links(message.id, message.content, message.jump_url)
+        ):
+            await self.bot.db.save_removed_links(message.channel.id, rows)
+
         if message.author.bot:
             return
         if message.channel.id in channel_ids:
@@ -192,8 +237,9 @@ class Events(commands.Cog):
                     duplicate_links_string = "\n".join(
                         [
                             f"{'://'.join(disallowed_link)} | [Go to message]({jump_url})"
-                            for disallowed_link, jump_url in self.all_disallowed_messages
-                            if link == disallowed_link
+                            for _, disallowed_link, jump_url in self.all_disallowed_messages.get(
+                                link
+                            )
                         ]
                     )
                     if len(duplicate_links_string) > 0:
@@ -202,22 +248,116 @@ class Events(commands.Cog):
                         )
 
                 if len(embed.fields) > 0 or len(embed.description) > 0:
-                    reply_message = await message.reply(embed=embed)
-                    await reply_message.add_reaction("❌")
+                    reply_message = await self.bot.rest.submit(
+                        Priority.HIGH, "reply", message.reply(embed=embed)
+                    )
+                    await self.bot.rest.submit(
+                        Priority.HIGH, "reaction", reply_message.add_reaction("❌")
+                    )
 
                     if len(embed.footer) > 0:
-                        await reply_message.add_reaction("📋")
+                        await self.bot.rest.submit(
+                            Priority.HIGH, "reaction", reply_message.add_reaction("📋")
+                        )
 
                 return
 
     @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload):
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        self.fetched_messages.pop(payload.message_id, None)
+        if payload.channel_id not in disallowed_channel_ids or "content" not in payload.data:
+            return
+
+        channel = self.bot.get_channel(payload.channel_id)
+        if not channel:
+            return
+        self.all_disallowed_messages.remove(payload.message_id)
+        await self.bot.db.delete_removed_links((payload.message_id,))
+        rows = self.index_disallowed_links(
+            payload.message_id,
+            payload.data["content"],
+            channel.get_partial_message(payload.message_id).jump_url,
+        )
+        if rows:
+            await self.bot.db.save_removed_links(payload.channel_id, rows)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        self.fetched_messages.pop(payload.message_id, None)
+        if payload.channel_id in disallowed_channel_ids:
+            self.all_disallowed_messages.remove(payload.message_id)
+            await self.bot.db.delete_removed_links((payload.message_id,))
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        for message_id in payload.message_ids:
+            self.fetched_messages.pop(message_id, None)
+        if payload.channel_id in disallowed_channel_ids:
+            for message_id in payload.message_ids:
+                self.all_disallowed_messages.remove(message_id)
+            await self.bot.db.delete_removed_links(payload.message_ids)
+
+    async def get_message(
+        self, channel: discord.abc.Messageable, message_id: int
+    ) -> discord.Message:
+        """Returns the message from the gateway cache, fetching it only if it is not there.
+
+        :param channel: Channel the message was sent in
+        :param message_id: Id of the message
+        :return: Message object
+        """
+        msg = self.bot._connection._get_message(message_id)  # noqa: SLF001
+        if msg is not None:
+            return msg
+
+        msg = self.fetched_messages.get(message_id)
+        if msg is None:
+            # Someone is waiting on the reaction this resolves
+            msg = await self.bot.rest.submit(
+                Priority.HIGH, "fetch", channel.fetch_message(message_id)
+            )
+            self.fetched_messages[message_id] = msg
+            if len(self.fetched_messages) > self.fetched_messages_size:
+                self.fetched_messages.popitem(last=False)
+        self.fetched_messages.move_to_end(message_id)
+        return msg
+
+    async def get_referenced_message(
+        self, channel: discord.abc.Messageable, msg: discord.Message
+    ) -> discord.Message | None:
+        """Returns the current version of the message a reply points to.
+
+        ``msg.reference.resolved`` is frozen when the reply is fetched, it goes stale once the
+        original is edited or deleted, so the original is looked up again instead.
+
+        :param channel: Channel the reply was sent in
+        :param msg: The reply
+        :return: Message object, None if there is none or it was deleted
+        """
+        if msg.reference is None or msg.reference.message_id is None:
+            return None
+        try:
+            return await self.get_message(channel, msg.reference.message_id)
+        except discord.NotFound:
+            return None
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         emoji = payload.emoji
+        # Checked before resolving anything, most reactions are not ours to handle. DM reactions
+        # have no member and the bot's own reactions never trigger an action.
+        if (
+            emoji not in self.reaction_emojis
+            or payload.member is None
+            or payload.user_id == self.bot.user.id
+        ):
+            return
+
         chan_id = payload.channel_id
         msg_id = payload.message_id
-        channel = await self.bot.fetch_channel(chan_id)
-        msg: discord.Message = await channel.fetch_message(msg_id)
-        user = await self.bot.fetch_user(payload.user_id)
+        channel = self.bot.get_channel(chan_id) or await self.bot.fetch_channel(chan_id)
+        msg = await self.get_message(channel, msg_id)
+        user = payload.member
         if not isinstance(channel, discord.DMChannel):
             # Bookmark message
             if emoji == self.bookmark_emoji:
@@ -246,8 +386,10 @@ class Events(commands.Cog):
                         attach += f"{attachment.url}\n"
 
                 try:
-                    sent = await user.send(content=f"\n{attach}", embed=embed)
-                    await sent.add_reaction("❌")
+                    sent = await self.bot.rest.submit(
+                        Priority.MEDIUM, "dm", user.send(content=f"\n{attach}", embed=embed)
+                    )
+                    await self.bot.rest.submit(Priority.MEDIUM, "reaction", sent.add_reaction("❌"))
                 except discord.Forbidden:
                     # Nobody cares about this
                     pass
@@ -259,18 +401,20 @@ class Events(commands.Cog):
             ):
                 managing_user = any(role.id in managing_roles for role in payload.member.roles)
 
-                if msg.reference is not None and not isinstance(
-                    msg.reference.resolved, discord.DeletedReferencedMessage
-                ):
-                    referenced_msg = msg.reference.resolved
-                    is_author = referenced_msg.author.id == payload.user_id
-
-                    if managing_user or is_author:
-                        await referenced_msg.delete()
-                        await msg.delete()
-                else:
-                    if managing_user:
-                        await msg.delete()
+                referenced_msg = await self.get_referenced_message(channel, msg)
+                to_delete = []
+                if referenced_msg is not None:
+                    if managing_user or referenced_msg.author.id == payload.user_id:
+                        to_delete = [referenced_msg, msg]
+                elif managing_user:
+                    to_delete = [msg]
+
+                for message in to_delete:
+                    try:
+                        await message.delete()
+                    except discord.NotFound:
+                        # Deleted by someone else in the meantime
+                        pass
 
             # Send non-duplicate links as embed
             if (
@@ -278,18 +422,20 @@ class Events(commands.Cog):
                 and msg.author.id == self.bot.user.id
                 and payload.user_id != self.bot.user.id
             ):
-                if msg.reference is not None and not isinstance(
-                    msg.reference.resolved, discord.DeletedReferencedMessage
-                ):
-                    original_message = msg.reference.resolved
+                original_message = await self.get_referenced_message(channel, msg)
+                if original_message is not None:
                     non_duplicate_links_embed = await self.filter_nonduplicates_embed(
                         original_message
                     )
 
                     if non_duplicate_links_embed is not None:
-                        await msg.reply(embed=non_duplicate_links_embed)
+                        await self.bot.rest.submit(
+                            Priority.HIGH, "reply", msg.reply(embed=non_duplicate_links_embed)
+                        )
                 else:
-                    await msg.reply("Unable to find original message")
+                    await self.bot.rest.submit(
+                        Priority.HIGH, "reply", msg.reply("Unable to find original message")
+                    )
 
 
 async def setup(bot: Bot):
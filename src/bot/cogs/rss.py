@@ -1,9 +1,86 @@
+import logging
+from collections import deque
+from collections.abc import Iterable
+
+import discord
 from discord.channel import ForumChannel
 from discord.ext import commands, tasks
 
 from bot.core import Bot
 from bot.core.config import news_forum, news_tag
-from bot.core.helpers import fetch_feeds
+from bot.core.feeds import FeedPoller
+from bot.core.helpers import Article
+from bot.core.scheduler import Priority
+from bot.core.seen import SeenStore, create_seen_store
+
+logger = logging.getLogger(__name__)
+
+# Discord rejects longer forum thread names
+THREAD_NAME_LIMIT = 100
+
+
+def thread_name(title: str) -> str:
+    return title if len(title) <= THREAD_NAME_LIMIT else title[: THREAD_NAME_LIMIT - 1] + "…"
+
+
+class ThreadPublisher:
+    """Posts queued articles as threads in the news forum, oldest first.
+
+    Threads go through the ``"thread"`` budget of the REST scheduler, which paces them. An
+    article is only marked as seen once its thread exists. One that hit a rate limit or a server
+    error stays queued for the next cycle, one that Discord rejected is logged and dropped so it
+    can't block the articles behind it.
+    """
+
+    def __init__(self, bot: Bot, store: SeenStore) -> None:
+        self.bot = bot
+        self.store = store
+        self.queue: deque[Article] = deque()
+
+    def extend(self, articles: Iterable[Article]) -> None:
+        queued = {article.link for article in self.queue}
+        self.queue.extend(article for article in articles if article.link not in queued)
+
+    async def publish(self) -> int:
+        """Posts the queued articles.
+
+        :return: Number of threads created
+        """
+        if not self.queue:
+            return 0
+
+        # Resolved once per cycle instead of per article
+        forum = self.bot.get_channel(news_forum)
+        if not isinstance(forum, ForumChannel):
+            return 0
+        tag = forum.get_tag(news_tag)
+        if not tag:
+            return 0
+
+        posted = 0
+        while self.queue:
+            article = self.queue[0]
+            try:
+                await self.bot.rest.submit(
+                    Priority.LOW,
+                    "thread",
+                    forum.create_thread(
+                        name=thread_name(article.title),
+                        content=article.link,
+                        reason="Thread created by FMHY Bot",
+                        applied_tags=[tag],
+                    ),
+                )
+            except discord.HTTPException as exc:
+                if exc.status == 429 or exc.status >= 500:
+                    logger.warning(f"Failed to post {article.link}, retrying next cycle: {exc}")
+                    break
+                logger.error(f"Discord rejected {article.link}, dropping it: {exc}")
+            else:
+                posted += 1
+            await self.store.add((article.link,))
+            self.queue.popleft()
+        return posted
 
 
 class RSSFeeds(commands.Cog):
@@ -11,6 +88,9 @@ class RSSFeeds(commands.Cog):
 
     def __init__(self, bot: Bot):
         self.bot = bot
+        store = create_seen_store(bot.db)
+        self.poller = FeedPoller(bot.session, store)
+        self.publisher = ThreadPublisher(bot, store)
 
     async def cog_load(self):
         self.send_rss.start()
@@ -19,21 +99,11 @@ class RSSFeeds(commands.Cog):
         self.send_rss.stop()
         return await super().cog_unload()
 
-    @tasks.loop(seconds=300)
+    # Each feed is only fetched once it is due, see FeedState
+    @tasks.loop(seconds=60)
     async def send_rss(self):
-        for feed in fetch_feeds():
-            forum = self.bot.get_channel(news_forum)
-            if not isinstance(forum, ForumChannel):
-                return
-            tag = forum.get_tag(news_tag)
-            if not tag:
-                return
-            await forum.create_thread(
-                name=feed.title,
-                content=feed.link,
-                reason="Thread created by FMHY Bot",
-                applied_tags=[tag],
-            )
+        self.publisher.extend(await self.poller.poll())
+        await self.publisher.publish()
 
 
 async def setup(bot: Bot):
@@ -1,24 +1,135 @@
+import asyncio
 import random
 import re
+import time
 
-from discord import Embed, Interaction, app_commands
-from discord.ext import commands
+import aiohttp
+from discord import ButtonStyle, Color, Embed, Interaction, app_commands
+from discord.ext import commands, tasks
+from discord.ui import Button, View, button
 
 from bot.core import Bot
 from bot.core.config import url_regex
-from bot.core.search_help import execute
+from bot.core.search_help import WikiFetcher, getAllChunks
+from bot.core.search_index import SearchCache, SearchIndex, SearchResults, normalize_query
+
+RESULTS_PER_PAGE = 5
+# Seconds between refreshes started by /search while the index is still empty
+INDEX_RETRY_INTERVAL = 60
+
+
+class SearchView(View):
+    """Pages through an already ranked result set, so paging never re-runs the search."""
+
+    def __init__(self, query: str, results: SearchResults) -> None:
+        super().__init__()
+        self.query = query
+        self.results = results
+        self.page = 0
+        self.pages = max(1, -(-len(results.lines) // RESULTS_PER_PAGE))
+        self.update_buttons()
+
+    def update_buttons(self) -> None:
+        self.previous_button.disabled = self.page == 0
+        self.next_button.disabled = self.page >= self.pages - 1
+
+    def embed(self) -> Embed:
+        start = self.page * RESULTS_PER_PAGE
+        lines = [
+            f"**{number}** - {line}"
+            for number, line in enumerate(
+                self.results.lines[start : start + RESULTS_PER_PAGE], start=start + 1
+            )
+        ]
+        embed = Embed(title=f"Search Results for {self.query}", color=0x2B2D31)
+        embed.description = "\n".join(lines)[:4096] or "No results found."
+        embed.set_footer(
+            text=f"Page {self.page + 1}/{self.pages} • {len(self.results.lines)} results"
+        )
+        return embed
+
+    async def show_page(self, interaction: Interaction, page: int) -> None:
+        self.page = max(0, min(page, self.pages - 1))
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @button(emoji="◀️", style=ButtonStyle.grey)
+    async def previous_button(self, interaction: Interaction, _: Button) -> None:
+        await self.show_page(interaction, self.page - 1)
+
+    @button(emoji="▶️", style=ButtonStyle.grey)
+    async def next_button(self, interaction: Interaction, _: Button) -> None:
+        await self.show_page(interaction, self.page + 1)
 
 
 class Wiki(commands.Cog):
     """Commands for interacting with the wiki."""
 
+    list_url = "https://rentry.co/oghty/raw"
+
     def __init__(self, bot: Bot):
         self.bot = bot
+        self.index = SearchIndex.empty()
+        self.index_attempt = -INDEX_RETRY_INTERVAL
+        self.fetcher = WikiFetcher(bot.session)
+        self.search_cache = SearchCache()
+        self.list_urls: tuple[str, ...] = ()
+        self.list_validators: dict[str, str] = {}
+
+    async def cog_load(self) -> None:
+        self.refresh_index.start()
+        self.refresh_list.start()
+        return await super().cog_load()
+
+    async def cog_unload(self) -> None:
+        self.refresh_index.stop()
+        self.refresh_list.stop()
+        return await super().cog_unload()
+
+    @tasks.loop(minutes=10)
+    async def refresh_index(self):
+        """Rebuilds the changed partitions of the index, keeping the current index on failure."""
+        self.index_attempt = time.monotonic()
+        chunks = await getAllChunks(self.fetcher, self.bot.snapshot)
+        if not any(chunks.values()):
+            self.bot.logger.warning(
+                f"Wiki refresh returned no lines, keeping the index of {len(self.index)} lines."
+            )
+            return
+        if not self.index.changed(chunks):
+            return
+        self.index = await asyncio.to_thread(self.index.updated, chunks)
+        self.bot.logger.info(f"Updated wiki search index, now {len(self.index)} lines.")
+
+    @tasks.loop(minutes=30)
+    async def refresh_list(self):
+        """Re-downloads the list of lists if it changed, keeping the last good copy on failure."""
+        headers = {}
+        if etag := self.list_validators.get("ETag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self.list_validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
 
-    async def get_urls_from_rentry(self):
-        async with self.bot.session.get("https://rentry.co/oghty/raw") as response:
-            urls = await response.text()
-        return list({f"{protocol}://{domain}" for protocol, domain in re.findall(url_regex, urls)})
+        try:
+            async with self.bot.session.get(self.list_url, headers=headers) as response:
+                if response.status == 304:
+                    return
+                response.raise_for_status()
+                urls = await response.text()
+        except (aiohttp.ClientError, TimeoutError) as exc:
+            self.bot.logger.warning(f"Failed to refresh the list of lists: {exc}")
+            return
+
+        self.list_validators = {
+            name: response.headers[name]
+            for name in ("ETag", "Last-Modified")
+            if name in response.headers
+        }
+        self.list_urls = tuple(
+            dict.fromkeys(
+                f"{protocol}://{domain}" for protocol, domain in re.findall(url_regex, urls)
+            )
+        )
 
     @app_commands.command(name="list", description="Displays random URL(s) from the list of lists.")
     @app_commands.describe(url_num="Number of URLs to display")
@@ -28,9 +139,19 @@ class Wiki(commands.Cog):
             url_num = 1
         elif url_num > 25:
             url_num = 25
-        list_urls = await self.get_urls_from_rentry()
-        random_urls = random.sample(list_urls, url_num)
-        title = f"Here are {url_num} random URL{'s' if url_num > 1 else ''} from the list of lists:"
+        if not self.list_urls:
+            await self.refresh_list()
+        if not self.list_urls:
+            error_embed = Embed(
+                title=":warning: The list of lists is unavailable",
+                description="It could not be downloaded, try again in a few minutes.",
+                color=Color.red(),
+            )
+            await interaction.followup.send(embed=error_embed, ephemeral=True)
+            return
+        random_urls = random.sample(self.list_urls, min(url_num, len(self.list_urls)))
+        count = len(random_urls)
+        title = f"Here are {count} random URL{'s' if count > 1 else ''} from the list of lists:"
         list_embed = Embed(
             title=title,
             color=0x2B2D31,
@@ -42,11 +163,29 @@ class Wiki(commands.Cog):
     @app_commands.command(name="search", description="Search for query in the wiki")
     async def searchwiki(self, interaction: Interaction, query: str):
         await interaction.response.defer()
-        search = await execute(query)
-        results = search[0]
-        list_embed = Embed(title=f"Search Results for {query}", color=0x2B2D31)
-        list_embed.description = "\n".join(results)
-        await interaction.followup.send(embed=list_embed, ephemeral=True)
+        if not self.index and time.monotonic() - self.index_attempt >= INDEX_RETRY_INTERVAL:
+            await self.refresh_index()
+        nsfw = getattr(interaction.channel, "is_nsfw", lambda: False)()
+        normalized = normalize_query(query)
+        index = self.index
+        results = self.search_cache.get(index, normalized, nsfw)
+        if results is None:
+            results = await asyncio.to_thread(index.search, normalized, nsfw)
+            self.search_cache.put(index, normalized, nsfw, results)
+        view = SearchView(query, results)
+        await interaction.followup.send(embed=view.embed(), view=view, ephemeral=True)
+
+    @commands.command(name="searchstats")
+    @commands.is_owner()
+    async def search_stats(self, ctx: commands.Context):
+        """Show how much work the /search result cache saves."""
+        cache = self.search_cache
+        lookups = cache.hits + cache.misses
+        hit_rate = f"{cache.hits / lookups:.1%}" if lookups else "-"
+        await ctx.send(
+            f"Search cache: {cache.hits} hits, {cache.misses} misses ({hit_rate} hit rate), "
+            f"{len(cache)}/{cache.maxsize} entries, index version {self.index.version}"
+        )
 
 
 async def setup(bot: Bot):
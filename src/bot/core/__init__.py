@@ -12,6 +12,8 @@ from discord.ext import commands
 from bot.core import formatter, help
 from bot.core.config import OWNERS, prefix
 from bot.core.database import Database
+from bot.core.scheduler import RestScheduler
+from bot.core.snapshot import WikiSnapshot
 
 os.environ["JISHAKU_NO_UNDERSCORE"] = "True"
 
@@ -76,6 +78,8 @@ class Bot(commands.Bot):
             owner_ids=OWNERS,
         )
         self.session: aiohttp.ClientSession = session
+        self.snapshot = WikiSnapshot(session)
+        self.rest = RestScheduler()
         formatter.install("discord", "INFO")
         formatter.install("bot", "INFO")
         self.logger = logging.getLogger("bot")
@@ -1,4 +1,6 @@
+from functools import cache
 from pathlib import Path
+from typing import NamedTuple
 
 from discord import Color
 from PIL import ImageFont
@@ -28,10 +30,9 @@ REACTION_R = "🇷"
 REACTION_NUMBERS = ("1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣")
 
 
-font = ImageFont.truetype(
-    str(Path("data", "fonts", "RobotoCondensed-Bold.ttf")), 80, encoding="utf-8"
-)
-big_font = ImageFont.truetype(str(Path("data", "fonts", "Roboto-Bold.ttf")), 350, encoding="utf-8")
+@cache
+def load_font(name: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(str(Path("data", "fonts", name)), size, encoding="utf-8")
 
 
 dictionaries = {
@@ -46,41 +47,76 @@ dictionaries = {
 }
 
 
-class Paths:
-    img_dir = Path("state", "images")
-    db = Path("state", "database.db")
+class ImageFormat(NamedTuple):
+    label: str
+    extension: str
 
-    @classmethod
-    def cap_img(cls, game_uuid: str) -> Path:
-        return Path(cls.img_dir, f"{game_uuid}-spymaster.png")
 
-    @classmethod
-    def cap_img_init(cls, game_uuid: str) -> Path:
-        return Path(cls.img_dir, f"{game_uuid}-spymaster-initial.png")
+image_formats = {
+    "lossless": ImageFormat("Lossless PNG", "png"),
+    "png": ImageFormat("Optimized PNG (128 colors)", "png"),
+    "webp": ImageFormat("WebP", "webp"),
+}
 
-    @classmethod
-    def pl_img(cls, game_uuid: str) -> Path:
-        return Path(cls.img_dir, f"{game_uuid}-player.png")
+
+class Paths:
+    db = Path("state", "database.db")
 
     @staticmethod
     def dictionary(name: str) -> Path:
         return Path("data", "dictionaries", f"{name}.txt")
 
 
+class Resolution(NamedTuple):
+    label: str
+    scale: float
+
+
 class FieldSizing:
-    width = 3840
-    height = 2160
+    """Field geometry and fonts, every length is the 4K one times ``scale``.
 
-    text_anchor = "mm"  # Middle of the rectangle
+    Get one with :meth:`at` or :meth:`preset`, sizings and their fonts are cached per scale.
+    """
+
+    presets = {
+        "4k": Resolution("4K (3840x2160)", 1),
+        "1080p": Resolution("1080p (1920x1080)", 1 / 2),
+        "720p": Resolution("720p (1280x720)", 1 / 3),
+    }
 
-    footer_height = 400
+    text_anchor = "mm"  # Middle of the rectangle
 
     card_count = 5
-    card_spacing = 50
-    card_width = (width - (card_spacing * (card_count + 1))) / card_count
-    card_height = (height - footer_height - (card_spacing * (card_count + 1))) / card_count
-    card_radius = 10
-    card_outline_width = 2
+
+    def __init__(self, scale: float) -> None:
+        self.scale = scale
+        self.width = round(3840 * scale)
+        self.height = round(2160 * scale)
+
+        self.footer_height = round(400 * scale)
+
+        # Whole pixels, so cards line up with the pixel grid at every scale
+        self.card_spacing = round(50 * scale)
+        self.card_width = (
+            self.width - self.card_spacing * (self.card_count + 1)
+        ) // self.card_count
+        self.card_height = (
+            self.height - self.footer_height - self.card_spacing * (self.card_count + 1)
+        ) // self.card_count
+        self.card_radius = 10 * scale
+        self.card_outline_width = max(1, round(2 * scale))
+
+        self.font = load_font("RobotoCondensed-Bold.ttf", round(80 * scale))
+        self.big_font = load_font("Roboto-Bold.ttf", round(350 * scale))
+
+    @classmethod
+    @cache
+    def at(cls, scale: float) -> "FieldSizing":
+        return cls(scale)
+
+    @classmethod
+    def preset(cls, name: str) -> "FieldSizing":
+        return cls.at(cls.presets[name].scale)
 
 
 class Colors:
@@ -1,219 +1,300 @@
 import random
 from collections.abc import Iterable, Sequence
+from functools import cache
+from io import BytesIO
+from typing import NamedTuple
 
 import aiofiles
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 
-from bot.core.codenames.constants import Colors, FieldSizing, Paths, big_font, font
+from bot.core.codenames.constants import Colors, FieldSizing, Paths, image_formats
 
 FIRST_TEAM_WORD_COUNT = 9
 SECOND_TEAM_WORD_COUNT = 8
 
 
-def field(
-    team1_words: Iterable[str],
-    team2_words: Iterable[str],
-    endgame_word: str,
-    no_team_words: Iterable[str],
-    opened_words: Iterable[str],
-    order: Sequence[str],
-    uuid: str,
-) -> None:
-    """Creates and saves captain and player fields as images from the given game word lists.
-
-    :param team1_words: Red cards
-    :param team2_words: Blue cards
-    :param endgame_word: Black card
-    :param no_team_words: White cards
-    :param opened_words: "Used" words
-    :param order: Order that the words should be displayed in
-    :param game_uuid: Game uuid to save images without conflicts
-    :return: None
-    """
-    img = Image.new("RGB", (FieldSizing.width, FieldSizing.height), Colors.background)
-    draw = ImageDraw.Draw(img)
+class CardStyle(NamedTuple):
+    fill: tuple[int, int, int]
+    outline: tuple[int, int, int]
+    font: tuple[int, int, int]
 
-    # Drawing two bottom rectangles with left words counter
-    draw.rectangle(
-        xy=(
-            0,
-            FieldSizing.height - FieldSizing.footer_height,
-            FieldSizing.width / 2 - 1,
-            FieldSizing.height - 1,
-        ),
-        fill=Colors.red_fill,
+
+CLOSED_STYLE = CardStyle(Colors.neutral_fill, Colors.neutral_outline, Colors.neutral_font)
+
+# Card styles by (team, opened), the captain sees every team, players only the opened cards
+CAPTAIN_STYLES = {
+    ("red", False): CardStyle(Colors.red_fill, Colors.red_fill, Colors.red_font),
+    ("red", True): CardStyle(
+        Colors.red_opened_fill, Colors.red_opened_fill, Colors.red_opened_font
+    ),
+    ("blue", False): CardStyle(Colors.blue_fill, Colors.blue_fill, Colors.blue_font),
+    ("blue", True): CardStyle(
+        Colors.blue_opened_fill, Colors.blue_opened_fill, Colors.blue_opened_font
+    ),
+    ("black", False): CardStyle(Colors.black_fill, Colors.black_fill, Colors.black_font),
+    ("black", True): CardStyle(
+        Colors.black_opened_fill, Colors.black_opened_fill, Colors.black_opened_font
+    ),
+    ("neutral", False): CLOSED_STYLE,
+    ("neutral", True): CardStyle(
+        Colors.neutral_opened_cap_fill,
+        Colors.neutral_opened_cap_outline,
+        Colors.neutral_opened_cap_font,
+    ),
+}
+PLAYER_STYLES = {
+    ("red", False): CLOSED_STYLE,
+    ("red", True): CardStyle(Colors.red_fill, Colors.red_fill, Colors.red_font),
+    ("blue", False): CLOSED_STYLE,
+    ("blue", True): CardStyle(Colors.blue_fill, Colors.blue_fill, Colors.blue_font),
+    ("black", False): CLOSED_STYLE,
+    ("black", True): CardStyle(Colors.black_fill, Colors.black_fill, Colors.black_font),
+    ("neutral", False): CLOSED_STYLE,
+    ("neutral", True): CardStyle(
+        Colors.neutral_opened_pl_fill,
+        Colors.neutral_opened_pl_outline,
+        Colors.neutral_opened_pl_font,
+    ),
+}
+
+
+def card_position(index: int, sizing: FieldSizing) -> tuple[int, int]:
+    """Returns the top left corner of the card at the given index of the order."""
+    x, y = divmod(index, sizing.card_count)
+    return (
+        int(sizing.card_spacing * (x + 1) + sizing.card_width * x),
+        int(sizing.card_spacing * (y + 1) + sizing.card_height * y),
     )
-    red_words_left = 0
-    for word in team1_words:
-        if word not in opened_words:
-            red_words_left += 1
-    draw.text(
-        xy=(FieldSizing.width / 4, FieldSizing.height - FieldSizing.footer_height / 2),
-        text=str(red_words_left),
-        fill=Colors.red_font,
-        font=big_font,
-        anchor=FieldSizing.text_anchor,
+
+
+def card_size(sizing: FieldSizing) -> tuple[int, int]:
+    return int(sizing.card_width) + 1, int(sizing.card_height) + 1
+
+
+@cache
+def card_sprite(style: CardStyle, sizing: FieldSizing) -> Image.Image:
+    """Card of the given style without its label, shared by every game of that size."""
+    sprite = Image.new("RGB", card_size(sizing), Colors.background)
+    ImageDraw.Draw(sprite).rounded_rectangle(
+        xy=(0, 0, sizing.card_width, sizing.card_height),
+        radius=sizing.card_radius,
+        fill=style.fill,
+        outline=style.outline,
+        width=sizing.card_outline_width,
     )
+    return sprite
 
+
+@cache
+def background(sizing: FieldSizing) -> Image.Image:
+    """Empty field with the two footer rectangles, shared by every game of that size."""
+    img = Image.new("RGB", (sizing.width, sizing.height), Colors.background)
+    draw = ImageDraw.Draw(img)
+    top = sizing.height - sizing.footer_height
+    draw.rectangle(xy=(0, top, sizing.width / 2 - 1, sizing.height - 1), fill=Colors.red_fill)
     draw.rectangle(
-        xy=(
-            FieldSizing.width / 2,
-            FieldSizing.height - FieldSizing.footer_height,
-            FieldSizing.width - 1,
-            FieldSizing.height - 1,
-        ),
+        xy=(sizing.width / 2, top, sizing.width - 1, sizing.height - 1),
         fill=Colors.blue_fill,
     )
-    blue_words_left = 0
-    for word in team2_words:
-        if word not in opened_words:
-            blue_words_left += 1
-    draw.text(
-        xy=(
-            FieldSizing.width / 2 + FieldSizing.width / 4,
-            FieldSizing.height - FieldSizing.footer_height / 2,
-        ),
-        text=str(blue_words_left),
-        fill=Colors.blue_font,
-        font=big_font,
+    return img
+
+
+class Label(NamedTuple):
+    offset: tuple[int, int]
+    mask: Image.Image
+
+
+def render_label(
+    text: str,
+    size: tuple[int, int],
+    center: tuple[float, float],
+    label_font: ImageFont.FreeTypeFont,
+) -> Label:
+    """Renders text centered on a point of a box of the given size, as a mask cropped to the glyphs."""
+    mask = Image.new("L", size, 0)
+    ImageDraw.Draw(mask).text(
+        xy=center,
+        text=text,
+        fill=255,
+        font=label_font,
         anchor=FieldSizing.text_anchor,
     )
+    bbox = mask.getbbox() or (0, 0, 0, 0)
+    return Label(bbox[:2], mask.crop(bbox))
+
+
+@cache
+def counter_label(count: int, sizing: FieldSizing) -> Label:
+    return render_label(
+        str(count),
+        (int(sizing.width / 2), sizing.footer_height),
+        (sizing.width / 4, sizing.footer_height / 2),
+        sizing.big_font,
+    )
+
+
+def paste_label(
+    img: Image.Image, position: tuple[int, int], label: Label, color: tuple[int, int, int]
+) -> None:
+    x, y = position[0] + label.offset[0], position[1] + label.offset[1]
+    img.paste(color, (x, y, x + label.mask.width, y + label.mask.height), label.mask)
+
+
+def encode(img: Image.Image, buffer: BytesIO, image_format: str) -> None:
+    """Encodes a field with the settings of one of the ``image_formats``.
 
-    # Creating two separate images for two fields
-    cap_img = img.copy()
-    cap_draw = ImageDraw.Draw(cap_img)
-    pl_img = img.copy()
-    pl_draw = ImageDraw.Draw(pl_img)
-
-    fill_col: tuple[int, int, int] = Colors.neutral_fill
-    outline_col: tuple[int, int, int] = Colors.neutral_outline
-    font_col: tuple[int, int, int] = Colors.neutral_font
-
-    # Filling the captain's field
-    for x in range(FieldSizing.card_count):
-        for y in range(FieldSizing.card_count):
-            word = order[x * FieldSizing.card_count + y]
-            if word in team1_words:
-                if word in opened_words:
-                    fill_col = Colors.red_opened_fill
-                    outline_col = Colors.red_opened_fill
-                    font_col = Colors.red_opened_font
-                else:
-                    fill_col = Colors.red_fill
-                    outline_col = Colors.red_fill
-                    font_col = Colors.red_font
-            elif word in team2_words:
-                if word in opened_words:
-                    fill_col = Colors.blue_opened_fill
-                    outline_col = Colors.blue_opened_fill
-                    font_col = Colors.blue_opened_font
-                else:
-                    fill_col = Colors.blue_fill
-                    outline_col = Colors.blue_fill
-                    font_col = Colors.blue_font
-            elif word == endgame_word:
-                if word in opened_words:
-                    fill_col = Colors.black_opened_fill
-                    outline_col = Colors.black_opened_fill
-                    font_col = Colors.black_opened_font
-                else:
-                    fill_col = Colors.black_fill
-                    outline_col = Colors.black_fill
-                    font_col = Colors.black_font
-            elif word in no_team_words:
-                if word in opened_words:
-                    fill_col = Colors.neutral_opened_cap_fill
-                    outline_col = Colors.neutral_opened_cap_outline
-                    font_col = Colors.neutral_opened_cap_font
-                else:
-                    fill_col = Colors.neutral_fill
-                    outline_col = Colors.neutral_outline
-                    font_col = Colors.neutral_font
-
-            cap_draw.rounded_rectangle(
-                xy=(
-                    FieldSizing.card_spacing * (x + 1) + FieldSizing.card_width * x,
-                    FieldSizing.card_spacing * (y + 1) + FieldSizing.card_height * y,
-                    (FieldSizing.card_spacing + FieldSizing.card_width) * (x + 1),
-                    (FieldSizing.card_spacing + FieldSizing.card_height) * (y + 1),
-                ),
-                radius=FieldSizing.card_radius,
-                fill=fill_col,
-                outline=outline_col,
-                width=FieldSizing.card_outline_width,
-            )
-
-            cap_draw.text(
-                xy=(
-                    FieldSizing.card_spacing * (x + 1)
-                    + FieldSizing.card_width * x
-                    + FieldSizing.card_width / 2,
-                    FieldSizing.card_spacing * (y + 1)
-                    + FieldSizing.card_height * y
-                    + FieldSizing.card_height / 2,
-                ),
-                text=str(word).upper(),
-                fill=font_col,
-                font=font,
-                anchor=FieldSizing.text_anchor,
-            )
-
-    # Filling the players' field
-    for x in range(FieldSizing.card_count):
-        for y in range(FieldSizing.card_count):
-            word = order[x * FieldSizing.card_count + y]
-            if word in opened_words:
-                if word in team1_words:
-                    fill_col = Colors.red_fill
-                    outline_col = Colors.red_fill
-                    font_col = Colors.red_font
-                elif word in team2_words:
-                    fill_col = Colors.blue_fill
-                    outline_col = Colors.blue_fill
-                    font_col = Colors.blue_font
-                elif word == endgame_word:
-                    fill_col = Colors.black_fill
-                    outline_col = Colors.black_fill
-                    font_col = Colors.black_font
-                elif word in no_team_words:
-                    fill_col = Colors.neutral_opened_pl_fill
-                    outline_col = Colors.neutral_opened_pl_outline
-                    font_col = Colors.neutral_opened_pl_font
-            else:
-                fill_col = Colors.neutral_fill
-                outline_col = Colors.neutral_outline
-                font_col = Colors.neutral_font
-
-            pl_draw.rounded_rectangle(
-                xy=(
-                    FieldSizing.card_spacing * (x + 1) + FieldSizing.card_width * x,
-                    FieldSizing.card_spacing * (y + 1) + FieldSizing.card_height * y,
-                    (FieldSizing.card_spacing + FieldSizing.card_width) * (x + 1),
-                    (FieldSizing.card_spacing + FieldSizing.card_height) * (y + 1),
-                ),
-                radius=FieldSizing.card_radius,
-                fill=fill_col,
-                outline=outline_col,
-                width=FieldSizing.card_outline_width,
-            )
-
-            pl_draw.text(
-                xy=(
-                    FieldSizing.card_spacing * (x + 1)
-                    + FieldSizing.card_width * x
-                    + FieldSizing.card_width / 2,
-                    FieldSizing.card_spacing * (y + 1)
-                    + FieldSizing.card_height * y
-                    + FieldSizing.card_height / 2,
-                ),
-                text=str(word).upper(),
-                fill=font_col,
-                font=font,
-                anchor=FieldSizing.text_anchor,
-            )
-
-    cap_img.save(Paths.cap_img(uuid))
-    pl_img.save(Paths.pl_img(uuid))
+    Lossless PNG is what fields were always sent as. The fields only hold a few flat colors and their anti-aliased edges, so a 128 color palette
+    PNG looks the same while being smaller and faster to compress. WebP uses the fastest lossy
+    method.
+
+    :param img: Field image
+    :param buffer: Buffer the encoded image is written to
+    :param image_format: Key of ``image_formats``
+    :return: None
+    """
+    if image_format == "lossless":
+        img.save(buffer, "PNG")
+    elif image_format == "webp":
+        img.save(buffer, "WEBP", quality=85, method=0)
+    elif image_format == "png":
+        img.quantize(128, method=Image.Quantize.FASTOCTREE).save(buffer, "PNG")
+    else:
+        raise ValueError(
+            f"Unknown image format {image_format!r}, expected one of {', '.join(image_formats)}."
+        )
+
+
+class FieldRenderer:
+    """Renders the fields of one game from pre-rendered sprites.
+
+    Card backgrounds and the empty field are shared between games of the same size, the word
+    labels are rendered once when the game starts. The game's captain and player fields are kept in
+    memory, a render only repaints the cards that were opened since the previous one and the
+    footer counters that changed.
+    """
+
+    def __init__(
+        self,
+        team1_words: Iterable[str],
+        team2_words: Iterable[str],
+        endgame_word: str,
+        no_team_words: Iterable[str],
+        order: Sequence[str],
+        sizing: FieldSizing,
+        image_format: str = "lossless",
+    ) -> None:
+        """Pre-renders the word labels of the game.
+
+        :param team1_words: Red cards
+        :param team2_words: Blue cards
+        :param endgame_word: Black card
+        :param no_team_words: White cards
+        :param order: Order that the words should be displayed in
+        :param sizing: Size of the fields
+        :param image_format: Key of ``image_formats`` the fields are encoded as
+        """
+        self.team1_words = set(team1_words)
+        self.team2_words = set(team2_words)
+        self.order = tuple(order)
+        self.teams = {word: "neutral" for word in no_team_words}
+        self.teams.update(dict.fromkeys(self.team1_words, "red"))
+        self.teams.update(dict.fromkeys(self.team2_words, "blue"))
+        self.teams[endgame_word] = "black"
+        self.sizing = sizing
+        self.image_format = image_format
+        self.positions = {
+            word: card_position(index, sizing) for index, word in enumerate(self.order)
+        }
+
+        card_center = (sizing.card_width / 2, sizing.card_height / 2)
+        self.labels = {
+            word: render_label(word.upper(), card_size(sizing), card_center, sizing.font)
+            for word in self.order
+        }
+
+        self.cap_img: Image.Image | None = None
+        self.pl_img: Image.Image | None = None
+        self.opened: set[str] = set()
+        self.counters = (-1, -1)
+        self.cap_file = BytesIO()
+        self.pl_file = BytesIO()
+        self.initial_cap_file: bytes | None = None
+
+    def paint_card(self, word: str, opened: bool) -> None:
+        state = (self.teams[word], opened)
+        position = self.positions[word]
+        for img, style in (
+            (self.cap_img, CAPTAIN_STYLES[state]),
+            (self.pl_img, PLAYER_STYLES[state]),
+        ):
+            img.paste(card_sprite(style, self.sizing), position)  # type: ignore
+            paste_label(img, position, self.labels[word], style.font)  # type: ignore
+
+    def paint_counters(self, counters: tuple[int, int]) -> None:
+        sizing = self.sizing
+        half = int(sizing.width / 2)
+        footer_top = sizing.height - sizing.footer_height
+        sides = (
+            (0, Colors.red_fill, Colors.red_font),
+            (half, Colors.blue_fill, Colors.blue_font),
+        )
+        for count, previous, (left, fill, color) in zip(
+            counters, self.counters, sides, strict=True
+        ):
+            if count == previous:
+                continue
+            for img in (self.cap_img, self.pl_img):
+                img.paste(fill, (left, footer_top, left + half, sizing.height))  # type: ignore
+                paste_label(img, (left, footer_top), counter_label(count, sizing), color)  # type: ignore
+        self.counters = counters
+
+    def render(self, opened_words: Iterable[str]) -> tuple[Image.Image, Image.Image]:
+        """Renders captain and player fields.
+
+        The returned images are owned by the renderer and are updated in place by the next
+        render, copy them to keep a field around.
+
+        :param opened_words: "Used" words
+        :return: Captain and player field images
+        """
+        opened_words = set(opened_words)
+        if self.cap_img is None or not self.opened <= opened_words:
+            self.cap_img = background(self.sizing).copy()
+            self.pl_img = background(self.sizing).copy()
+            self.opened = set()
+            self.counters = (-1, -1)
+            for word in self.order:
+                self.paint_card(word, word in opened_words)
+        else:
+            for word in opened_words - self.opened:
+                self.paint_card(word, True)
+        self.opened = opened_words
+
+        self.paint_counters(
+            (len(self.team1_words - opened_words), len(self.team2_words - opened_words))
+        )
+        return self.cap_img, self.pl_img  # type: ignore
+
+    @property
+    def extension(self) -> str:
+        return image_formats[self.image_format].extension
+
+    def field(self, opened_words: Iterable[str]) -> None:
+        """Renders captain and player fields and encodes them in the game's image format.
+
+        The results are written to :attr:`cap_file` and :attr:`pl_file`, which are reused by
+        every render. The first captain field is also kept as :attr:`initial_cap_file`.
+
+        :param opened_words: "Used" words
+        :return: None
+        """
+        fields = self.render(opened_words)
+        for img, buffer in zip(fields, (self.cap_file, self.pl_file), strict=True):
+            buffer.seek(0)
+            buffer.truncate()
+            encode(img, buffer, self.image_format)
+        if self.initial_cap_file is None:
+            self.initial_cap_file = self.cap_file.getvalue()
 
 
 async def words(dict_name: str) -> tuple[list[str], list[str], str, list[str], list[str]]:
@@ -256,26 +337,3 @@ async def words(dict_name: str) -> tuple[list[str], list[str], str, list[str], l
     #     available_words,
     # )
     return team1_words, team2_words, endgame_word, no_team_words, available_words
-
-
-# Mock field generation
-if __name__ == "__main__":
-    import asyncio
-
-    team_red_words, team_blue_words, endgame_word, no_team_words, available_words = asyncio.run(
-        words("std")
-    )
-
-    order = available_words.copy()  # Has to be a list
-    random.shuffle(order)
-    order = tuple(order)
-
-    field(
-        team_red_words,
-        team_blue_words,
-        endgame_word,
-        no_team_words,
-        no_team_words,
-        order,
-        "test",
-    )
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class RenderStats:
+    __slots__ = ("calls", "max_time", "max_wait", "total_time", "total_wait")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, wait: float, elapsed: float) -> None:
+        self.calls += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.calls if self.calls else 0.0
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class RenderPool:
+    """Runs codenames rendering and PNG encoding in worker threads, off the event loop.
+
+    At most ``workers`` jobs run at once, the others wait in the event loop so a game cancelled
+    while queued never occupies a worker. A started job keeps its slot until its thread is done,
+    even if its game is cancelled meanwhile. Pillow releases the GIL while pasting and encoding,
+    so games in different channels render in parallel. Threads are used instead of processes because a
+    :class:`~bot.core.codenames.generation.FieldRenderer` keeps its fields in memory between
+    renders.
+    """
+
+    def __init__(self, workers: int = 2) -> None:
+        self.workers = workers
+        self.stats: dict[str, RenderStats] = {}
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="codenames-render")
+        self._slots = asyncio.Semaphore(workers)
+        self._waiting = 0
+
+    async def submit(self, kind: str, func: Callable[..., T], *args: Any) -> T:
+        """Runs the function in a worker thread once one is free.
+
+        :param kind: What is rendered, the stats are kept per kind
+        :param func: Function to run, must not touch the event loop
+        :param args: Arguments of the function
+        :return: Result of the function
+        """
+        enqueued = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        # The slot is returned when the thread is done, not when a cancelled game stops waiting
+        def release(_: Future) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._slots.release)
+
+        future.add_done_callback(release)
+
+        result = await asyncio.wrap_future(future)
+        finished = time.perf_counter()
+        self.stats.setdefault(kind, RenderStats()).record(started - enqueued, finished - started)
+        return result
+
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -5,7 +5,14 @@ from typing import cast
 from discord import ButtonStyle, Embed, Interaction, Member, SelectOption, User
 from discord.ui import Button, Select, View, button, select
 
-from bot.core.codenames.constants import CODENAMES_ROLE, EMPTY, Colors, dictionaries
+from bot.core.codenames.constants import (
+    CODENAMES_ROLE,
+    EMPTY,
+    Colors,
+    FieldSizing,
+    dictionaries,
+    image_formats,
+)
 from bot.core.codenames.messages import messages
 from bot.core.codenames.util import send_alert, send_error
 from bot.core.database import Database
@@ -15,7 +22,7 @@ class StartView(View):
     def __init__(
         self,
         start_callback: Callable[
-            [Interaction, list[User | Member], list[User | Member], str], Coroutine
+            [Interaction, list[User | Member], list[User | Member], str, str, str], Coroutine
         ],
         caller_id: int,
     ) -> None:
@@ -32,12 +39,18 @@ class StartView(View):
         self.team_blue: list[User | Member] = []
 
         self.dictionary: str = "std"
+        self.resolution: str = "4k"
+        self.image_format: str = "lossless"
 
-        # Update the select menu with the current dictionary
-        for child in self.children:
-            if isinstance(child, Select):
-                child.placeholder = f"Current: {dictionaries[self.dictionary]}"
-                break
+        self.update_placeholders()
+
+    def update_placeholders(self) -> None:
+        """Shows the current settings in the select menus."""
+        self.select_dict.placeholder = f"Current: {dictionaries[self.dictionary]}"
+        self.select_resolution.placeholder = (
+            f"Current: {FieldSizing.presets[self.resolution].label}"
+        )
+        self.select_image_format.placeholder = f"Current: {image_formats[self.image_format].label}"
 
     def remove_player(self, player: Member | User) -> None:
         if player in self.no_team:
@@ -86,12 +99,14 @@ class StartView(View):
         players_embed.add_field(
             name="Dictionary", value=dictionaries[self.dictionary], inline=False
         )
+        players_embed.add_field(
+            name="Field images",
+            value=f"{FieldSizing.presets[self.resolution].label}, "
+            f"{image_formats[self.image_format].label}",
+            inline=False,
+        )
 
-        # Update the select menu with the current dictionary
-        for child in self.children:
-            if isinstance(child, Select):
-                child.placeholder = f"Current: {dictionaries[self.dictionary]}"
-                break
+        self.update_placeholders()
         await interaction.followup.edit_message(
             interaction.message.id,  # type: ignore
             embed=players_embed,
@@ -168,6 +183,7 @@ class StartView(View):
         min_values=1,
         max_values=1,
         options=[SelectOption(label=label, value=value) for value, label in dictionaries.items()],
+        row=0,
     )
     async def select_dict(self, interaction: Interaction, select: Select) -> None:
         if cast(Member, interaction.user).get_role(CODENAMES_ROLE) is None:
@@ -178,6 +194,44 @@ class StartView(View):
         await interaction.response.defer()
         await self.update(interaction)
 
+    @select(
+        placeholder="Select a field resolution...",
+        min_values=1,
+        max_values=1,
+        options=[
+            SelectOption(label=resolution.label, value=value)
+            for value, resolution in FieldSizing.presets.items()
+        ],
+        row=3,
+    )
+    async def select_resolution(self, interaction: Interaction, select: Select) -> None:
+        if cast(Member, interaction.user).get_role(CODENAMES_ROLE) is None:
+            await interaction.response.defer()
+            await send_error(interaction, messages.errors.title, messages.errors.not_host)
+            return
+        self.resolution = select.values[0]
+        await interaction.response.defer()
+        await self.update(interaction)
+
+    @select(
+        placeholder="Select a field image format...",
+        min_values=1,
+        max_values=1,
+        options=[
+            SelectOption(label=image_format.label, value=value)
+            for value, image_format in image_formats.items()
+        ],
+        row=4,
+    )
+    async def select_image_format(self, interaction: Interaction, select: Select) -> None:
+        if cast(Member, interaction.user).get_role(CODENAMES_ROLE) is None:
+            await interaction.response.defer()
+            await send_error(interaction, messages.errors.title, messages.errors.not_host)
+            return
+        self.image_format = select.values[0]
+        await interaction.response.defer()
+        await self.update(interaction)
+
     async def start_pre_callback(self, interaction: Interaction) -> None:
         if self.game_started:  # ignoring duplicate starts from same registration
             return
@@ -229,7 +283,14 @@ class StartView(View):
 
         await self.update(interaction, final=True)
 
-        await self.start_callback(interaction, self.team_red, self.team_blue, self.dictionary)
+        await self.start_callback(
+            interaction,
+            self.team_red,
+            self.team_blue,
+            self.dictionary,
+            self.resolution,
+            self.image_format,
+        )
 
     async def cancel_callback(self, interaction: Interaction) -> None:
         await interaction.followup.edit_message(
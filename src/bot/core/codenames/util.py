@@ -1,5 +1,6 @@
 import asyncio
 from collections.abc import Callable, Iterable
+from io import BytesIO
 from typing import Any
 
 from discord import (
@@ -16,8 +17,10 @@ from discord import (
 from discord.ext.commands import Command, Parameter
 from discord.ui import Button, View, button
 
-from bot.core.codenames.constants import Colors, Paths
+from bot.core.codenames.constants import Colors
+from bot.core.codenames.generation import FieldRenderer
 from bot.core.codenames.messages import messages
+from bot.core.scheduler import Priority, RestScheduler
 
 
 class AlertView(View):
@@ -168,8 +171,31 @@ async def vote(
     return pros, cons
 
 
+def field_file(buffer: BytesIO, filename: str) -> File:
+    """Wraps an encoded field for sending, the buffer is rewound so it can be sent again.
+
+    :param buffer: Encoded image
+    :param filename: Name of the attachment
+    :return: File object
+    """
+    buffer.seek(0)
+    return File(buffer, filename=filename)
+
+
+async def send_dm(scheduler: RestScheduler, user: User | Member, **kwargs: Any) -> Message:
+    """Sends a direct message through the scheduler, at the priority of DMs.
+
+    :param scheduler: Scheduler the DM goes through
+    :param user: User to send to
+    :param kwargs: Arguments of :meth:`User.send`
+    :return: Sent message
+    """
+    return await scheduler.submit(Priority.MEDIUM, "dm", user.send(**kwargs))
+
+
 async def send_fields(
-    uuid: str,
+    scheduler: RestScheduler,
+    fields: FieldRenderer,
     channel: PartialMessageable,
     first_cap: User | Member,
     second_cap: User | Member,
@@ -177,15 +203,20 @@ async def send_fields(
 ) -> None:
     """Sends fields to the game text channel (player filed) and to the captains (captain field).
 
-    :param uuid: Game uuid to access field files
+    :param scheduler: Scheduler the captain DMs go through
+    :param fields: Renderer holding the encoded fields
     :param channel: Game text channel
     :param first_cap: First captain User object
     :param second_cap: Second captain User object
     :param send_to_caps: Whether to send the field to captains
     :return: None
     """
-    await channel.send(file=File(Paths.pl_img(uuid), filename="player_field.png"))
+    await channel.send(file=field_file(fields.pl_file, f"player_field.{fields.extension}"))
 
     if send_to_caps:
-        await first_cap.send(file=File(Paths.cap_img(uuid), filename="captain_field.png"))
-        await second_cap.send(file=File(Paths.cap_img(uuid), filename="captain_field.png"))
+        for cap in (first_cap, second_cap):
+            await send_dm(
+                scheduler,
+                cap,
+                file=field_file(fields.cap_file, f"captain_field.{fields.extension}"),
+            )
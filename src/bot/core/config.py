@@ -31,6 +31,8 @@ RSS_CHANNELS = _get("RSS_CHANNEL_IDS")
 FEEDS = _get("RSS_FEED_URLS")
 MKSWT_KEY = _get("MKSWT_KEY")
 DB = os.environ.get("DB_URI")
+# Backend of the RSS seen-articles state, "mongo" or "sqlite"
+rss_store = os.environ.get("RSS_STORE") or ("mongo" if DB else "sqlite")
 
 url_regex = re.compile(
     r"(https?):\/\/(?:ww(?:w|\d+)\.)?((?:[\w_-]+(?:\.[\w_-]+)+)[\w.,@?^=%&:\/~+#-]*[\w@?^=%&~+-])"
@@ -32,6 +32,15 @@ class Database:
             "(id int primary key, date text,"
             "games int, games_cap int, wins int, wins_cap int)"
         )
+        await db.execute(
+            "CREATE TABLE IF NOT EXISTS removed_links "
+            "(message_id int, channel_id int, protocol text, link text, jump_url text,"
+            "PRIMARY KEY (message_id, protocol, link))"
+        )
+        await db.execute(
+            "CREATE TABLE IF NOT EXISTS channel_cursors (channel_id int primary key, message_id int)"
+        )
+        await db.execute("CREATE TABLE IF NOT EXISTS seen_articles (link text primary key)")
         await db.commit()
 
         cls._db = db
@@ -75,6 +84,16 @@ class Database:
         await self._db.execute(sql, parameters)
         await self._db.commit()
 
+    async def exec_many_and_commit(self, sql: str, parameters: Iterable[Iterable[Any]]) -> None:
+        """Executes the given SQL statement once per parameter set and commits the changes.
+
+        :param sql: SQL statement to execute
+        :param parameters: Parameters to the sql statement, one iterable per execution
+        :return: None
+        """
+        await self._db.executemany(sql, parameters)
+        await self._db.commit()
+
     async def increase_stats(self, player_id: int, stats: Iterable[str]) -> None:
         """Increases the given stats by 1 for the given player, then commits the changes to the database.
 
@@ -96,3 +115,43 @@ class Database:
             f"UPDATE players SET {' = ?, '.join(stats)} = ? WHERE id = ?",
             (*map(lambda stat: stat + 1, current_stats), player_id),  # type: ignore
         )
+
+    async def save_removed_links(
+        self,
+        channel_id: int,
+        links: Iterable[tuple[int, str, str, str]],
+        cursor: int | None = None,
+    ) -> None:
+        """Stores the links found in a channel and moves its cursor, in a single commit.
+
+        :param channel_id: Channel the links were fetched from
+        :param links: ``(message_id, protocol, link, jump_url)`` rows
+        :param cursor: Id of the newest message fetched from the channel, if it was paged through
+        :return: None
+        """
+        await self._db.executemany(
+            "INSERT OR IGNORE INTO removed_links VALUES (?, ?, ?, ?, ?)",
+            (
+                (message_id, channel_id, protocol, link, jump_url)
+                for message_id, protocol, link, jump_url in links
+            ),
+        )
+        if cursor is not None:
+            await self._db.execute(
+                "INSERT INTO channel_cursors VALUES (?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET message_id = excluded.message_id",
+                (channel_id, cursor),
+            )
+        await self._db.commit()
+
+    async def delete_removed_links(self, message_ids: Iterable[int]) -> None:
+        """Deletes the stored links of edited or deleted messages.
+
+        :param message_ids: Message ids
+        :return: None
+        """
+        await self._db.executemany(
+            "DELETE FROM removed_links WHERE message_id = ?",
+            ((message_id,) for message_id in message_ids),
+        )
+        await self._db.commit()
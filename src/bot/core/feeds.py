@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+
+import aiohttp
+import feedparser
+
+from bot.core.config import rss_feed_urls
+from bot.core.helpers import EMOJI, Article
+from bot.core.seen import SeenStore
+
+logger = logging.getLogger(__name__)
+
+FEED_TIMEOUT = aiohttp.ClientTimeout(total=10)
+# Seconds between polls of a feed, the interval adapts to how often it publishes
+MIN_INTERVAL = 300
+MAX_INTERVAL = 3600
+# Longest a failing feed is left alone
+MAX_BACKOFF = 6 * 3600
+
+
+class FeedState:
+    """What is known about a feed between polls.
+
+    ``interval`` adapts to how often the feed publishes, failures push ``next_poll`` back
+    exponentially without delaying any other feed.
+    """
+
+    __slots__ = (
+        "etag",
+        "failures",
+        "interval",
+        "last_entry_id",
+        "last_modified",
+        "next_poll",
+        "url",
+    )
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.last_entry_id: str | None = None
+        self.failures = 0
+        self.interval = MIN_INTERVAL
+        self.next_poll = 0.0
+
+    def succeeded(self, new_entries: int) -> None:
+        self.failures = 0
+        if new_entries:
+            self.interval = max(MIN_INTERVAL, self.interval / 2)
+        else:
+            self.interval = min(MAX_INTERVAL, self.interval * 1.5)
+        self.next_poll = time.time() + self.interval
+
+    def failed(self) -> None:
+        self.failures += 1
+        self.next_poll = time.time() + min(MIN_INTERVAL * 2**self.failures, MAX_BACKOFF)
+
+
+def entry_id(entry: feedparser.FeedParserDict) -> str:
+    return entry.get("id") or entry.link
+
+
+class FeedPoller:
+    """Polls the RSS feeds that are due, with conditional requests, and returns their new articles.
+
+    Every entry newer than the last one seen is returned, oldest first. The first poll of a feed
+    after startup resumes from its newest posted entry, see :meth:`unposted`. Articles are only
+    checked against the store, marking them as posted is up to the caller.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        store: SeenStore,
+        urls: Iterable[str] = rss_feed_urls,
+    ) -> None:
+        self.session = session
+        self.store = store
+        self.states = {url: FeedState(url) for url in urls}
+
+    async def unposted(
+        self, entries: list[feedparser.FeedParserDict]
+    ) -> list[feedparser.FeedParserDict]:
+        """Returns the entries newer than the newest one that was posted, newest first.
+
+        Used on the first poll of a feed, when there is no ``last_entry_id`` yet. Articles that
+        were still queued when the bot stopped are not in the store, so they are picked up again.
+        A feed with no posted entry only yields its latest one, so it does not repost its whole
+        history.
+
+        :param entries: Feed entries, newest first
+        :return: Entries to consider
+        """
+        seen = await self.store.seen(entry.link for entry in entries)
+        for position, entry in enumerate(entries):
+            if entry.link in seen:
+                return entries[:position]
+        return entries[:1]
+
+    async def fetch(self, state: FeedState) -> list[feedparser.FeedParserDict]:
+        """Downloads and parses a feed, parsing happens in a worker thread.
+
+        :param state: State of the feed, updated in place
+        :return: Entries newer than the last seen one, oldest first
+        """
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+
+        try:
+            async with self.session.get(
+                state.url, headers=headers, timeout=FEED_TIMEOUT
+            ) as response:
+                if response.status == 304:
+                    state.succeeded(0)
+                    return []
+                response.raise_for_status()
+                content = await response.read()
+        except TimeoutError:
+            logger.warning("Timeout when reading RSS %s", state.url)
+            state.failed()
+            return []
+        except aiohttp.ClientError as exc:
+            logger.warning("Failed to read RSS %s: %s", state.url, exc)
+            state.failed()
+            return []
+
+        feed = await asyncio.to_thread(feedparser.parse, content)
+
+        # Check if the feed was parsed successfully
+        if feed.bozo:
+            logger.info(f"Error parsing RSS feed: {feed.bozo_exception}")
+            logger.info(f"{state.url}")
+            state.failed()
+            return []
+
+        if state.last_entry_id:
+            entries = []
+            for entry in feed.entries:
+                if entry_id(entry) == state.last_entry_id:
+                    break
+                entries.append(entry)
+        else:
+            entries = await self.unposted(feed.entries)
+        entries.reverse()
+
+        state.etag = response.headers.get("ETag")
+        state.last_modified = response.headers.get("Last-Modified")
+        if feed.entries:
+            state.last_entry_id = entry_id(feed.entries[0])
+        state.succeeded(len(entries))
+        return entries
+
+    async def poll(self) -> list[Article]:
+        """Fetches every due feed concurrently and returns the articles that were not posted yet.
+
+        :return: New articles, per feed in feed order
+        """
+        now = time.time()
+        due = [state for state in self.states.values() if state.next_poll <= now]
+        feeds = await asyncio.gather(*(self.fetch(state) for state in due))
+        entries = [entry for entries in feeds for entry in entries]
+        seen = await self.store.seen(entry.link for entry in entries)
+
+        articles = []
+        for entry in entries:
+            if entry.link not in seen:
+                seen.add(entry.link)
+                articles.append(Article(title=f"{EMOJI}  |  {entry.title}", link=entry.link))
+
+        return articles
@@ -1,22 +1,8 @@
 import base64
-import logging
 from datetime import datetime
 
 import discord
-import feedparser
-import requests
 from attr import dataclass
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
-
-from bot.core.config import DB, rss_feed_urls
-
-client = MongoClient(DB, server_api=ServerApi("1"))
-
-mydb = client["fmby"]
-mycol = mydb["sent_articles"]
-
-logger = logging.getLogger(__name__)
 
 
 def cembed(title, description, **kwargs):
@@ -38,42 +24,6 @@ class Article:
     link: str
 
 
-def fetch_feeds():
-    # Load the seen IDs from the file, or create an empty dictionary
-    sent_articles = list(mycol.find().sort("_id", -1))
-
-    for rss_feed_url in rss_feed_urls:
-        try:
-            resp = requests.get(rss_feed_url, timeout=10.0)
-        except requests.ReadTimeout:
-            logger.warning("Timeout when reading RSS %s", rss_feed_url)
-            return
-
-        feed = feedparser.parse(resp.content)
-
-        # Check if the feed was parsed successfully
-        if feed.bozo:
-            logger.info(f"Error parsing RSS feed: {feed.bozo_exception}")
-            logger.info(f"{rss_feed_url}")
-            continue
-
-        last_entry = feed.entries[0]
-
-        x = list(mycol.find({"link": last_entry.link}))
-
-        if len(x) == 0:
-            article_title = last_entry.title
-            article_link = last_entry.link
-            mycol.insert_one({"link": last_entry.link})
-
-            # logger.info(f"New article: {article_title}")
-            # logger.info(f"Link: {article_link}")
-
-            yield Article(title=f"{EMOJI}  |  {article_title}", link=article_link)
-
-        # logger.info(f"Parsing complete for {rss_feed_url}")
-
-
 def split_discord_message(response, char_limit=1900):
     m_ls = []
     if len(response) > char_limit:
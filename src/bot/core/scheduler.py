@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from collections.abc import Coroutine
+from enum import IntEnum
+from typing import Any, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    HIGH = 0  # Replies to something a user just did
+    MEDIUM = 1  # DMs
+    LOW = 2  # Background work, RSS threads and the removed-links history backfill
+
+
+class RouteBudget(NamedTuple):
+    rate: int
+    per: float
+
+
+DEFAULT_BUDGETS = {
+    "dm": RouteBudget(5, 5),
+    "reply": RouteBudget(5, 5),
+    "reaction": RouteBudget(4, 1),
+    "thread": RouteBudget(2, 10),
+}
+
+
+class WaitStats:
+    __slots__ = ("calls", "max_wait", "total_wait")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.calls += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.calls if self.calls else 0.0
+
+
+class RestScheduler:
+    """Orders outbound REST calls by priority so bursts of background calls can't starve replies.
+
+    At most ``concurrency`` calls run at once, ``reserved`` of those slots are only given to
+    :attr:`Priority.HIGH` calls. Routes with a budget (e.g. ``"dm"``) start at most ``rate``
+    calls per ``per`` seconds, calls beyond that wait without blocking other routes.
+    discord.py still handles the actual rate limit headers, this only decides who goes first.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        reserved: int = 2,
+        budgets: dict[str, RouteBudget] | None = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.reserved = reserved
+        self.budgets = DEFAULT_BUDGETS if budgets is None else budgets
+        self.stats = {priority: WaitStats() for priority in Priority}
+        self._in_flight = 0
+        self._waiting: list[tuple[Priority, int, str, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._started: dict[str, deque[float]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def submit(self, priority: Priority, route: str, coro: Coroutine[Any, Any, T]) -> T:
+        """Runs the coroutine once the route budget and a slot for its priority allow it.
+
+        :param priority: Priority class of the call
+        :param route: Budget the call counts against
+        :param coro: Coroutine making the REST call, not awaited yet
+        :return: Result of the coroutine
+        """
+        enqueued = time.monotonic()
+        try:
+            await self._acquire(priority, route)
+        except BaseException:
+            coro.close()
+            raise
+
+        self.stats[priority].record(time.monotonic() - enqueued)
+        try:
+            return await coro
+        finally:
+            self._release()
+
+    def queue_depth(self) -> dict[Priority, int]:
+        depth = dict.fromkeys(Priority, 0)
+        for priority, _, _, future in self._waiting:
+            if not future.done():
+                depth[priority] += 1
+        return depth
+
+    async def _acquire(self, priority: Priority, route: str) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._counter), route, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():  # Granted right as it was cancelled
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _budget_wait(self, route: str, now: float) -> float:
+        if (budget := self.budgets.get(route)) is None:
+            return 0.0
+        started = self._started.setdefault(route, deque())
+        while started and started[0] <= now - budget.per:
+            started.popleft()
+        return 0.0 if len(started) < budget.rate else started[0] + budget.per - now
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        retry_in: float | None = None
+        blocked = []
+        while self._waiting and self._in_flight < self.concurrency:
+            entry = heapq.heappop(self._waiting)
+            priority, _, route, future = entry
+            if future.done():
+                continue
+            limit = self.concurrency - (0 if priority is Priority.HIGH else self.reserved)
+            if self._in_flight >= limit:
+                blocked.append(entry)
+                continue
+            if wait := self._budget_wait(route, now):
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+                blocked.append(entry)
+                continue
+            if route in self.budgets:
+                self._started[route].append(now)
+            self._in_flight += 1
+            future.set_result(None)
+
+        for entry in blocked:
+            heapq.heappush(self._waiting, entry)
+        if retry_in is not None:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = asyncio.get_running_loop().call_later(retry_in, self._dispatch)
@@ -1,103 +1,218 @@
+import asyncio
+import hashlib
+import logging
+import re
+from collections.abc import Iterator
+from typing import NamedTuple
+
 import aiohttp
 
-# enable text coloring only if the requirements are met
-coloring = False
+from bot.core.snapshot import WikiSnapshot
 
+logger = logging.getLogger(__name__)
 
 # ----------------Alt Indexing------------
 doAltIndexing = True
 
 
-def addPretext(lines, icon, baseURL, subURL):
-    modified_lines = []
+headingRegex = re.compile(r"(#+) (►|▷)?")
+contentRegex = re.compile(r"[^\W\d_]")
+
+
+class WikiCategory:
+    """Heading state shared by every line below it, with its pretext formatted once."""
+
+    __slots__ = ("preText", "url")
+
+    def __init__(self, icon, subCat, subSubCat, url) -> None:
+        self.url = url
+        self.preText = f"[{icon}{subCat}{subSubCat}]({url}) ► "
+
+
+class WikiLine(NamedTuple):
+    category: WikiCategory
+    text: str
+
+    def __str__(self) -> str:
+        return self.category.preText + self.text
+
+
+def headingSlug(title):
+    return "#" + title.replace(" / ", "--").replace(" ", "-").lower()
+
+
+def parseWikiChunk(lines, icon, baseURL, subURL) -> Iterator[WikiLine]:
+    """Prefixes every content line of a wiki chunk with the link to its category.
+
+    Headings are classified with one precompiled regex and the category is only built when a
+    heading changes it, every content line then just references it.
+
+    :param lines: Raw markdown lines
+    :param icon: Chunk icon
+    :param baseURL: Base URL for the heading links
+    :param subURL: Chunk sub URL
+    :return: Iterator of :class:`WikiLine`
+    """
+    isStorage = subURL == "storage"
     currMdSubheading = ""
     currSubCat = ""
     currSubSubCat = ""
+    category = WikiCategory(icon, currSubCat, currSubSubCat, f"{baseURL}{subURL}")
 
     for line in lines:
         if line.startswith("#"):  # Title Lines
-            if not subURL == "storage":
-                if line.startswith("# ►"):
-                    currMdSubheading = (
-                        "#"
-                        + line.replace("# ►", "")
-                        .strip()
-                        .replace(" / ", "--")
-                        .replace(" ", "-")
-                        .lower()
-                    )
-                    currSubCat = "/ " + line.replace("# ►", "").strip() + " "
+            match = headingRegex.match(line)
+            if match is None:
+                continue
+            level = len(match[1])
+            if isStorage:
+                title = line[level + 1 :].strip()
+                if level == 2:
+                    currMdSubheading = headingSlug(title)
+                    currSubCat = f"/ {title} "
                     currSubSubCat = ""
-                elif line.startswith("## ▷"):
-                    if (
-                        not subURL == "non-english"
-                    ):  # Because non-eng section has multiple subsubcats with same names
-                        currMdSubheading = (
-                            "#"
-                            + line.replace("## ▷", "")
-                            .strip()
-                            .replace(" / ", "--")
-                            .replace(" ", "-")
-                            .lower()
-                        )
-                    currSubSubCat = "/ " + line.replace("## ▷", "").strip() + " "
-            elif subURL == "storage":
-                if line.startswith("## "):
-                    currMdSubheading = (
-                        "#"
-                        + line.replace("## ", "")
-                        .strip()
-                        .replace(" / ", "--")
-                        .replace(" ", "-")
-                        .lower()
-                    )
-                    currSubCat = "/ " + line.replace("## ", "").strip() + " "
+                elif level == 3:
+                    currMdSubheading = headingSlug(title)
+                    currSubSubCat = f"/ {title} "
+                else:
+                    continue
+            else:
+                title = line[match.end() :].strip()
+                if level == 1 and match[2] == "►":
+                    currMdSubheading = headingSlug(title)
+                    currSubCat = f"/ {title} "
                     currSubSubCat = ""
-                elif line.startswith("### "):
-                    currMdSubheading = (
-                        "#"
-                        + line.replace("### ", "")
-                        .strip()
-                        .replace(" / ", "--")
-                        .replace(" ", "-")
-                        .lower()
-                    )
-                    currSubSubCat = "/ " + line.replace("### ", "").strip() + " "
+                elif level == 2 and match[2] == "▷":
+                    # Because non-eng section has multiple subsubcats with same names
+                    if subURL != "non-english":
+                        currMdSubheading = headingSlug(title)
+                    currSubSubCat = f"/ {title} "
+                else:
+                    continue
 
             # Remove links from subcategory titles (because the screw the format)
             if "http" in currSubCat:
                 currSubCat = ""
             if "http" in currSubSubCat:
                 currSubSubCat = ""
-
-        elif any(char.isalpha() for char in line):  # If line has content
-            preText = f"[{icon}{currSubCat}{currSubSubCat}]({baseURL}{subURL}{currMdSubheading}) ► "
-            if line.startswith("* "):
-                line = line[2:]
-            modified_lines.append(preText + line)
-
-    return modified_lines
-
-
-async def dlWikiChunk(fileName, icon, redditSubURL):
-    pagesDevSiteSubURL = fileName.replace(".md", "").lower()
-    subURL = pagesDevSiteSubURL
-    # print("Local file not found. Downloading " + fileName + "from Github...")
-    async with aiohttp.ClientSession() as session:
-        async with session.get(
-            "https://raw.githubusercontent.com/fmhy/edit/main/docs/" + fileName
-        ) as response:
+            category = WikiCategory(
+                icon, currSubCat, currSubSubCat, f"{baseURL}{subURL}{currMdSubheading}"
+            )
+
+        elif contentRegex.search(line):  # If line has content
+            yield WikiLine(category, line.removeprefix("* "))
+
+
+wikiChunks = (
+    ("VideoPiracyGuide.md", "📺", "video"),
+    ("AI.md", "🤖", "ai"),
+    ("Android-iOSGuide.md", "📱", "android"),
+    ("AudioPiracyGuide.md", "🎵", "audio"),
+    ("DownloadPiracyGuide.md", "💾", "download"),
+    ("EDUPiracyGuide.md", "🧠", "edu"),
+    ("GamingPiracyGuide.md", "🎮", "games"),
+    ("AdblockVPNGuide.md", "📛", "adblock-vpn-privacy"),
+    ("System-Tools.md", "💻", "system-tools"),
+    ("File-Tools.md", "🗃️", "file-tools"),
+    ("Internet-Tools.md", "🔗", "internet-tools"),
+    ("Social-Media-Tools.md", "💬", "social-media"),
+    ("Text-Tools.md", "📝", "text-tools"),
+    ("Video-Tools.md", "📼", "video-tools"),
+    ("MISCGuide.md", "📂", "misc"),
+    ("ReadingPiracyGuide.md", "📗", "reading"),
+    ("TorrentPiracyGuide.md", "🌀", "torrent"),
+    ("img-tools.md", "📷", "img-tools"),
+    ("LinuxGuide.md", "🐧🍏", "linux"),
+    ("DEVTools.md", "🖥️", "dev-tools"),
+    ("Non-English.md", "🌏", "non-eng"),
+    ("STORAGE.md", "🗄️", "storage"),
+    ("NSFWPiracy.md", "🌶", "https://saidit.net/s/freemediafuckyeah/wiki/index"),
+)
+
+
+class WikiFetcher:
+    """Downloads the wiki chunks concurrently over a shared session.
+
+    ETag/Last-Modified are kept per file and sent back on the next refresh, so unchanged files
+    come back as 304 and keep their already parsed lines. Files whose body hashes the same as
+    before are not re-parsed either, so the index can tell changed chunks apart by identity.
+    A file that fails to download keeps the lines of its last good version.
+    """
+
+    rawBaseURL = "https://raw.githubusercontent.com/fmhy/edit/main/docs/"
+
+    def __init__(self, session: aiohttp.ClientSession, maxConcurrency: int = 8) -> None:
+        self.session = session
+        self.semaphore = asyncio.Semaphore(maxConcurrency)
+        self.validators: dict[str, dict[str, str]] = {}
+        self.digests: dict[str, str] = {}
+        self.chunks: dict[str, list[WikiLine]] = {}
+
+    async def dlWikiChunk(self, fileName, icon, redditSubURL) -> bool:
+        pagesDevSiteSubURL = fileName.replace(".md", "").lower()
+        subURL = pagesDevSiteSubURL
+
+        headers = {}
+        validators = self.validators.get(fileName, {})
+        if fileName in self.chunks:
+            if "ETag" in validators:
+                headers["If-None-Match"] = validators["ETag"]
+            if "Last-Modified" in validators:
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+
+        async with (
+            self.semaphore,
+            self.session.get(self.rawBaseURL + fileName, headers=headers) as response,
+        ):
+            if response.status == 304:
+                return False
+            response.raise_for_status()
             t = await response.text()
-            lines = t.split("\n")
-    # print("Downloaded")
-
-    # add a pretext
-    redditBaseURL = "https://www.reddit.com/r/FREEMEDIAHECKYEAH/wiki/"
-    pagesDevSiteBaseURL = "https://fmhy.pages.dev/"
-    baseURL = pagesDevSiteBaseURL
-    lines = addPretext(lines, icon, baseURL, subURL)
-
-    return lines
+            self.validators[fileName] = {
+                header: response.headers[header]
+                for header in ("ETag", "Last-Modified")
+                if header in response.headers
+            }
+
+        digest = hashlib.sha1(t.encode()).hexdigest()
+        if self.digests.get(fileName) == digest and fileName in self.chunks:
+            return False
+        self.digests[fileName] = digest
+        lines = t.split("\n")
+
+        # add a pretext
+        pagesDevSiteBaseURL = "https://fmhy.pages.dev/"
+        baseURL = pagesDevSiteBaseURL
+        self.chunks[fileName] = list(parseWikiChunk(lines, icon, baseURL, subURL))
+
+        return True
+
+    async def alternativeWikiIndexing(self) -> list[str]:
+        """Refreshes every chunk in one concurrent wave.
+
+        A file that fails is logged and skipped, the others are still refreshed.
+
+        :return: Names of the files that changed since the previous refresh
+        """
+        results = await asyncio.gather(
+            *(self.dlWikiChunk(*chunk) for chunk in wikiChunks), return_exceptions=True
+        )
+        changed = []
+        for (fileName, _, _), result in zip(wikiChunks, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result  # Cancellation
+                logger.warning(f"Failed to refresh wiki chunk {fileName}: {result}")
+            elif result:
+                changed.append(fileName)
+        return changed
+
+    def orderedChunks(self) -> dict[str, list[WikiLine]]:
+        return {
+            fileName: self.chunks[fileName]
+            for fileName, _, _ in wikiChunks
+            if fileName in self.chunks
+        }
 
 
 def cleanLineForSearchMatchChecks(line):
@@ -106,83 +221,37 @@ def cleanLineForSearchMatchChecks(line):
     )
 
 
-async def alternativeWikiIndexing():
-    wikiChunks = [
-        await dlWikiChunk("VideoPiracyGuide.md", "📺", "video"),
-        await dlWikiChunk("AI.md", "🤖", "ai"),
-        await dlWikiChunk("Android-iOSGuide.md", "📱", "android"),
-        await dlWikiChunk("AudioPiracyGuide.md", "🎵", "audio"),
-        await dlWikiChunk("DownloadPiracyGuide.md", "💾", "download"),
-        await dlWikiChunk("EDUPiracyGuide.md", "🧠", "edu"),
-        await dlWikiChunk("GamingPiracyGuide.md", "🎮", "games"),
-        await dlWikiChunk("AdblockVPNGuide.md", "📛", "adblock-vpn-privacy"),
-        await dlWikiChunk("System-Tools.md", "💻", "system-tools"),
-        await dlWikiChunk("File-Tools.md", "🗃️", "file-tools"),
-        await dlWikiChunk("Internet-Tools.md", "🔗", "internet-tools"),
-        await dlWikiChunk("Social-Media-Tools.md", "💬", "social-media"),
-        await dlWikiChunk("Text-Tools.md", "📝", "text-tools"),
-        await dlWikiChunk("Video-Tools.md", "📼", "video-tools"),
-        await dlWikiChunk("MISCGuide.md", "📂", "misc"),
-        await dlWikiChunk("ReadingPiracyGuide.md", "📗", "reading"),
-        await dlWikiChunk("TorrentPiracyGuide.md", "🌀", "torrent"),
-        await dlWikiChunk("img-tools.md", "📷", "img-tools"),
-        await dlWikiChunk("LinuxGuide.md", "🐧🍏", "linux"),
-        await dlWikiChunk("DEVTools.md", "🖥️", "dev-tools"),
-        await dlWikiChunk("Non-English.md", "🌏", "non-eng"),
-        await dlWikiChunk("STORAGE.md", "🗄️", "storage"),
-        await dlWikiChunk(
-            "NSFWPiracy.md", "🌶", "https://saidit.net/s/freemediafuckyeah/wiki/index"
-        ),
-    ]
-    return [item for sublist in wikiChunks for item in sublist]
+# --------------------------------
 
 
-# --------------------------------
+async def standardWikiIndexing(snapshot: WikiSnapshot):
+    # Shares the single-page copy the Events cog keeps refreshed
+    return (await snapshot.get()).lines
 
 
-async def standardWikiIndexing():
-    # print("Local single-page file not found.")
-    # If that fails, try to get it from Github
-    # print("Loading FMHY single-page file from Github...")
-    async with aiohttp.ClientSession() as session:
-        async with session.get("https://api.fmhy.net/single-page") as response:
-            t = await response.text()
-            lines = t.split("\n")
-            return lines
+async def getAllChunks(
+    fetcher: WikiFetcher, snapshot: WikiSnapshot
+) -> dict[str, list[WikiLine] | list[str]]:
+    """Returns the wiki lines per source file.
 
+    Files that failed to refresh keep their last good lines, the single page is only used
+    when no chunk was ever loaded.
 
-async def getAllLines():
+    :param fetcher: Fetcher keeping the parsed chunks between refreshes
+    :param snapshot: Single page snapshot, the fallback
+    :return: Lines per source file, in wiki order
+    """
     if doAltIndexing:
-        try:
-            lines = await alternativeWikiIndexing()
-        except:
-            lines = standardWikiIndexing()
-    else:
-        lines = standardWikiIndexing()
-    return lines
+        await fetcher.alternativeWikiIndexing()
+        if fetcher.chunks:
+            return fetcher.orderedChunks()
+    return {"single-page": await standardWikiIndexing(snapshot)}
 
 
 def removeEmptyStringsFromList(stringList):
     return [string for string in stringList if string != ""]
 
 
-def checkMultiWordQueryContainedExactlyInLine(line, searchQuery):
-    if len(searchQuery.split(" ")) <= 1:
-        return False
-    return searchQuery.lower() in line.lower()
-
-
-def moveExactMatchesToFront(myList, searchQuery):
-    bumped = []
-    notBumped = []
-    for element in myList:
-        if checkMultiWordQueryContainedExactlyInLine(element, searchQuery):
-            bumped.append(element)
-        else:
-            notBumped.append(element)
-    return bumped + notBumped
-
-
 def checkList1isInList2(list1, list2):
     for element in list1:
         if element not in list2:
@@ -201,26 +270,6 @@ def checkWordForWordMatch(line, searchQuery):
     return checkList1isInList2(searchQueryWords, lineWords)
 
 
-def checkWordForWordMatchCaseSensitive(line, searchQuery):
-    lineWords = removeEmptyStringsFromList(line.replace("[", " ").replace("]", " ").split(" "))
-    lineWords = [
-        element.strip() for element in lineWords
-    ]  # doesnt work on streamlit without this line even though it works locally
-    searchQueryWords = removeEmptyStringsFromList(searchQuery.split(" "))
-    return checkList1isInList2(searchQueryWords, lineWords)
-
-
-def moveBetterMatchesToFront(myList, searchQuery):
-    bumped = []
-    notBumped = []
-    for element in myList:
-        if checkWordForWordMatch(element, searchQuery):
-            bumped.append(element)
-        else:
-            notBumped.append(element)
-    return bumped + notBumped
-
-
 def getOnlyFullWordMatches(myList, searchQuery):
     bumped = []
     for element in myList:
@@ -229,14 +278,6 @@ def getOnlyFullWordMatches(myList, searchQuery):
     return bumped
 
 
-def getOnlyFullWordMatchesCaseSensitive(myList, searchQuery):
-    bumped = []
-    for element in myList:
-        if checkWordForWordMatchCaseSensitive(element, searchQuery):
-            bumped.append(element)
-    return bumped
-
-
 def getLinesThatContainAllWords(lineList, searchQuery):
     words = removeEmptyStringsFromList(searchQuery.lower().split(" "))
     bumped = []
@@ -253,82 +294,21 @@ def getLinesThatContainAllWords(lineList, searchQuery):
     return bumped
 
 
+def isShortQuery(searchQuery):
+    return len(searchQuery) <= 2 or (searchQuery == searchQuery.upper() and len(searchQuery) <= 5)
+
+
+# Reference matching semantics, SearchIndex.search is tested against filterLines + filterOutNSFW
 def filterLines(lineList, searchQuery):
-    if len(searchQuery) <= 2 or (searchQuery == searchQuery.upper() and len(searchQuery) <= 5):
+    if isShortQuery(searchQuery):
         return getOnlyFullWordMatches(lineList, searchQuery)
     else:
         return getLinesThatContainAllWords(lineList, searchQuery)
 
 
-def filterOutTitleLines(lineList):
-    filteredList = []
-    sectionTitleList = []
-    for line in lineList:
-        if line[0] != "#":
-            filteredList.append(line)
-        else:
-            sectionTitleList.append(line)
-    return [filteredList, sectionTitleList]
-
-
 def filterOutNSFW(lineList):
     filteredList = []
     for line in lineList:
         if "nsfwpiracy" not in line:
             filteredList.append(line)
     return filteredList
-
-
-def addNumberingToStringList(string_list):
-    for i in range(len(string_list)):
-        string_list[i] = f"**{i + 1}** - {string_list[i]}"
-    return string_list
-
-
-def doASearch(searchInput, myLineList):
-    # intro to the search results
-    myFilterWords = removeEmptyStringsFromList(searchInput.lower().split(" "))
-
-    # main results
-    linesFoundPrev = filterLines(myLineList, searchInput)
-
-    sfwLines = filterOutNSFW(linesFoundPrev)
-
-    # limit result list
-    if len(linesFoundPrev) > 300:
-        # print("Too many results (" + str(len(linesFoundPrev)) + "). Showing only full-word matches.")
-        linesFoundPrev = getOnlyFullWordMatches(sfwLines, searchInput)
-
-    # rank results
-    # linesFoundPrev = moveExactMatchesToFront(linesFoundPrev, searchInput)
-    linesFoundPrev = moveBetterMatchesToFront(linesFoundPrev, searchInput)
-
-    # separate title lines
-    linesFoundAll = filterOutTitleLines(linesFoundPrev)
-    linesFound = linesFoundAll[0]
-    linesFound = addNumberingToStringList(sfwLines)
-    sectionTitleList = linesFoundAll[1]
-
-    # reverse list for terminal
-    # linesFound.reverse()
-
-    # check for coloring
-    textToprint = "\n\n".join(linesFound)
-
-    # # print main results
-
-    return [linesFound[:5], sectionTitleList]
-
-    # # print("# printing " + str(len(linesFound)) + " search results:\n")
-    # # print(textTo# print)
-    # # print("\nSearch ended with " + str(len(linesFound)) + " results found.\n")
-
-    # #title section results
-    # if len(sectionTitleList)>0:
-    #     # print("Also there are these section titles: ")
-    #     # print("\n".join(sectionTitleList))
-
-
-async def execute(query):
-    lineList = await getAllLines()
-    return doASearch(query, lineList)
@@ -0,0 +1,288 @@
+import math
+import re
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping
+from itertools import accumulate
+from typing import NamedTuple, Self
+
+from bot.core.search_help import (
+    WikiCategory,
+    WikiLine,
+    cleanLineForSearchMatchChecks,
+    getOnlyFullWordMatches,
+    isShortQuery,
+    removeEmptyStringsFromList,
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Multiplier for query words found in the heading part of a line
+HEADING_BOOST = 1.5
+# Multiplier for lines containing the whole query as a standalone phrase
+PHRASE_BOOST = 2.0
+
+
+def tokenize(line: str) -> set[str]:
+    """Returns every space separated token a search word could be a substring of.
+
+    Both the raw and the cleaned line are tokenized, so that the candidates are always a superset
+    of what ``filterLines`` would match on either of its paths.
+
+    :param line: Pretexted wiki line
+    :return: Set of lowercased tokens
+    """
+    tokens = set(line.lower().split(" "))
+    tokens.update(cleanLineForSearchMatchChecks(line).lower().split(" "))
+    tokens.discard("")
+    return tokens
+
+
+def line_length(line: str) -> int:
+    return len(line.split())
+
+
+def contains_phrase(pattern: re.Pattern[str], text: str) -> bool:
+    """Whether the pattern occurs in the text not preceded by a word character.
+
+    The pattern only carries the trailing boundary, a leading lookbehind would stop ``re`` from
+    scanning for the literal prefix and is several times slower.
+    """
+    for match in pattern.finditer(text):
+        start = match.start()
+        if not start or not (text[start - 1].isalnum() or text[start - 1] == "_"):
+            return True
+    return False
+
+
+class SearchResults(NamedTuple):
+    lines: list[str]
+    titles: list[str]
+
+
+class IndexPartition:
+    """Lines and postings (token -> line ids) of a single wiki source file.
+
+    Lines are either :class:`WikiLine` records or plain strings (single page fallback), the
+    tokens of a record's pretext are computed once per category.
+    """
+
+    __slots__ = ("lengths", "lines", "offsets", "postings", "token_postings", "vocabulary")
+
+    def __init__(self, lines: list[WikiLine] | list[str]) -> None:
+        self.lines = lines
+        self.lengths: list[int] = []
+        self.postings: dict[str, list[int]] = {}
+        category_tokens: dict[WikiCategory, tuple[set[str], int]] = {}
+        for line_id, line in enumerate(lines):
+            if isinstance(line, WikiLine):
+                if (cached := category_tokens.get(line.category)) is None:
+                    pretext = line.category.preText
+                    cached = category_tokens[line.category] = (
+                        tokenize(pretext),
+                        line_length(cleanLineForSearchMatchChecks(pretext)),
+                    )
+                tokens = cached[0] | tokenize(line.text)
+                self.lengths.append(cached[1] + line_length(line.text))
+            else:
+                tokens = tokenize(line)
+                self.lengths.append(line_length(cleanLineForSearchMatchChecks(line)))
+            for token in tokens:
+                self.postings.setdefault(token, []).append(line_id)
+
+        # Lines never contain a newline, so it can separate the tokens in one searchable string
+        self.vocabulary = "\n".join(self.postings)
+        self.token_postings = list(self.postings.values())
+        self.offsets = list(accumulate((len(token) + 1 for token in self.postings), initial=0))
+
+    def lookup(self, word: str) -> set[int]:
+        """Returns the ids of the lines that have the word inside one of their tokens.
+
+        A word can only be found inside a single token, so matching it against the vocabulary
+        gives a superset of the lines ``filterLines`` would keep.
+
+        :param word: Lowercased query word
+        :return: Line ids
+        """
+        matched: set[int] = set()
+        if "\n" in word:
+            return matched
+
+        # Scanning the joined vocabulary with str.find only visits the tokens that match
+        position = self.vocabulary.find(word)
+        while position != -1:
+            token_id = bisect_right(self.offsets, position) - 1
+            matched.update(self.token_postings[token_id])
+            position = self.vocabulary.find(word, self.offsets[token_id + 1])
+        return matched
+
+
+class SearchIndex:
+    """Inverted index over the pretexted wiki lines, partitioned per source file.
+
+    Instances are never mutated, :meth:`updated` returns a new index that shares the partitions
+    of every file that did not change, so a refresh only costs as much as the files it touched.
+    """
+
+    def __init__(self, partitions: dict[str, IndexPartition], version: int = 0) -> None:
+        self.partitions = partitions
+        self.version = version
+        self.line_count = sum(len(partition.lines) for partition in partitions.values())
+        total_length = sum(sum(partition.lengths) for partition in partitions.values())
+        self.average_length = total_length / self.line_count if self.line_count else 0.0
+
+    @classmethod
+    def empty(cls) -> Self:
+        return cls({})
+
+    def updated(self, chunks: Mapping[str, list[WikiLine] | list[str]]) -> Self:
+        """Builds a new index from the given chunks, reusing partitions whose lines are unchanged.
+
+        Chunk line lists are compared by identity, :class:`WikiFetcher` keeps the same list for
+        a file as long as its content hash does not change.
+
+        :param chunks: Parsed lines per source file, in wiki order
+        :return: SearchIndex object
+        """
+        partitions = {}
+        for name, lines in chunks.items():
+            partition = self.partitions.get(name)
+            if partition is None or partition.lines is not lines:
+                partition = IndexPartition(lines)
+            partitions[name] = partition
+        return type(self)(partitions, self.version + 1)
+
+    def changed(self, chunks: Mapping[str, list[WikiLine] | list[str]]) -> bool:
+        return chunks.keys() != self.partitions.keys() or any(
+            self.partitions[name].lines is not lines for name, lines in chunks.items()
+        )
+
+    def __len__(self) -> int:
+        return self.line_count
+
+    @property
+    def lines(self) -> list[str]:
+        return [str(line) for partition in self.partitions.values() for line in partition.lines]
+
+    def search(self, query: str, nsfw: bool = False) -> SearchResults:
+        """Finds the lines matching the query, ranked by BM25 with heading and phrase boosts.
+
+        Matching keeps the ``filterLines`` semantics, ties are broken by wiki order so the
+        results are deterministic.
+
+        :param query: Search query
+        :param nsfw: Whether NSFW lines should be kept
+        :return: Ranked lines and matching section titles
+        """
+        words = list(dict.fromkeys(removeEmptyStringsFromList(query.lower().split(" "))))
+        if not words:
+            return SearchResults([], [])
+
+        # Gather candidates and document frequencies in one pass over the partitions
+        document_frequency = dict.fromkeys(words, 0)
+        candidates: list[tuple[str, int]] = []
+        for partition in self.partitions.values():
+            line_ids: set[int] | None = None
+            for word in sorted(words, key=len, reverse=True):
+                matched = partition.lookup(word)
+                document_frequency[word] += len(matched)
+                line_ids = matched if line_ids is None else line_ids & matched
+            candidates.extend(
+                (str(partition.lines[line_id]), partition.lengths[line_id])
+                for line_id in sorted(line_ids)  # type: ignore
+            )
+
+        if isShortQuery(query):
+            full_word_matches = set(getOnlyFullWordMatches([line for line, _ in candidates], query))
+            candidates = [
+                candidate for candidate in candidates if candidate[0] in full_word_matches
+            ]
+
+        idf = {
+            word: math.log((self.line_count - df + 0.5) / (df + 0.5) + 1)
+            for word, df in document_frequency.items()
+        }
+        phrase = re.compile(rf"{re.escape(' '.join(words))}(?!\w)")
+        length_norm = K1 * (1 - B)
+        length_weight = K1 * B / (self.average_length or 1)
+
+        titles = []
+        scored = []
+        for order, (line, length) in enumerate(candidates):
+            cleaned = cleanLineForSearchMatchChecks(line).lower()
+            heading = cleaned.partition(" ► ")[0]
+            norm = length_norm + length_weight * length
+            score = 0.0
+            for word in words:
+                if not (tf := cleaned.count(word)):
+                    break  # Same as getLinesThatContainAllWords
+                term = idf[word] * tf * (K1 + 1) / (tf + norm)
+                score += term * HEADING_BOOST if word in heading else term
+            else:
+                if line.startswith("#"):
+                    titles.append(line)
+                    continue
+                if not nsfw and "nsfwpiracy" in line:  # Same as filterOutNSFW
+                    continue
+                if contains_phrase(phrase, cleaned):
+                    score *= PHRASE_BOOST
+                scored.append((-score, order, line))
+
+        scored.sort()
+        return SearchResults([line for _, _, line in scored], titles)
+
+
+def normalize_query(query: str) -> str:
+    """Collapses whitespace, and case too unless the query is short enough to match case-sensitively.
+
+    :param query: Search query
+    :return: Query to search and cache with
+    """
+    query = " ".join(removeEmptyStringsFromList(query.split(" ")))
+    return query if isShortQuery(query) else query.lower()
+
+
+class SearchCache:
+    """LRU of search results keyed by normalized query and NSFW flag.
+
+    Entries expire after ``ttl`` seconds and the whole cache is dropped as soon as it is used with
+    a different index version.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = -1
+        self.entries: OrderedDict[tuple[str, bool], tuple[float, SearchResults]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, index: SearchIndex, query: str, nsfw: bool) -> SearchResults | None:
+        if index.version != self.version:
+            self.entries.clear()
+            self.version = index.version
+
+        key = (query, nsfw)
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, index: SearchIndex, query: str, nsfw: bool, results: SearchResults) -> None:
+        if index.version != self.version:  # Index was swapped while searching
+            return
+
+        self.entries[(query, nsfw)] = (time.monotonic(), results)
+        self.entries.move_to_end((query, nsfw))
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, OperationFailure
+from pymongo.mongo_client import MongoClient
+from pymongo.server_api import ServerApi
+
+from bot.core.config import DB, rss_store
+from bot.core.database import Database
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on host parameters is 999
+SQLITE_BATCH_SIZE = 500
+
+
+class SeenStore(ABC):
+    """Links of the RSS articles that were already posted.
+
+    Lookups are answered from an LRU of recently seen links first, the rest are checked by the
+    backend in a single batched query, so neither memory nor database load grows with the
+    history.
+    """
+
+    def __init__(self, cache_size: int = 1024) -> None:
+        self.cache_size = cache_size
+        self.recent: OrderedDict[str, None] = OrderedDict()
+
+    def remember(self, links: Iterable[str]) -> None:
+        for link in links:
+            self.recent[link] = None
+            self.recent.move_to_end(link)
+        while len(self.recent) > self.cache_size:
+            self.recent.popitem(last=False)
+
+    async def seen(self, links: Iterable[str]) -> set[str]:
+        """Returns which of the links were already posted.
+
+        :param links: Candidate article links
+        :return: The subset of links that were seen
+        """
+        links = list(dict.fromkeys(links))
+        seen = {link for link in links if link in self.recent}
+        if missing := [link for link in links if link not in seen]:
+            seen |= await self.lookup(missing)
+        self.remember(seen)
+        return seen
+
+    async def add(self, links: Iterable[str]) -> None:
+        """Marks the links as posted, in one batch.
+
+        :param links: Article links
+        :return: None
+        """
+        if links := list(dict.fromkeys(links)):
+            await self.insert(links)
+            self.remember(links)
+
+    @abstractmethod
+    async def lookup(self, links: list[str]) -> set[str]:
+        """Returns the links the backend has stored."""
+
+    @abstractmethod
+    async def insert(self, links: list[str]) -> None:
+        """Stores the links, ignoring ones that are already stored."""
+
+
+class MongoSeenStore(SeenStore):
+    """Stores the links in the ``sent_articles`` collection.
+
+    The client is only created on first use, pymongo is synchronous so every call runs in a
+    worker thread instead of blocking the event loop.
+    """
+
+    def __init__(self, uri: str, cache_size: int = 1024) -> None:
+        super().__init__(cache_size)
+        self.uri = uri
+        self._collection: Collection | None = None
+
+    def collection(self) -> Collection:
+        if self._collection is None:
+            collection = MongoClient(self.uri, server_api=ServerApi("1"))["fmby"]["sent_articles"]
+            try:
+                collection.create_index("link", unique=True)
+            except OperationFailure as exc:  # Older data can hold duplicates
+                logger.warning(f"Could not create unique index on sent_articles.link: {exc}")
+                collection.create_index("link")
+            self._collection = collection
+        return self._collection
+
+    async def lookup(self, links: list[str]) -> set[str]:
+        def find() -> set[str]:
+            documents = self.collection().find({"link": {"$in": links}}, {"link": 1, "_id": 0})
+            return {document["link"] for document in documents}
+
+        return await asyncio.to_thread(find)
+
+    async def insert(self, links: list[str]) -> None:
+        def insert_many() -> None:
+            try:
+                self.collection().insert_many([{"link": link} for link in links], ordered=False)
+            except BulkWriteError as exc:
+                if any(error["code"] != 11000 for error in exc.details["writeErrors"]):
+                    raise  # Anything but a duplicate key
+
+        await asyncio.to_thread(insert_many)
+
+
+class SQLiteSeenStore(SeenStore):
+    """Stores the links in the ``seen_articles`` table of the bot's database."""
+
+    def __init__(self, db: Database, cache_size: int = 1024) -> None:
+        super().__init__(cache_size)
+        self.db = db
+
+    async def lookup(self, links: list[str]) -> set[str]:
+        found = set()
+        for start in range(0, len(links), SQLITE_BATCH_SIZE):
+            batch = links[start : start + SQLITE_BATCH_SIZE]
+            rows = await self.db.fetch(
+                f"SELECT link FROM seen_articles WHERE link IN ({', '.join('?' * len(batch))})",
+                batch,
+                fetchall=True,
+            )
+            found.update(link for (link,) in rows)
+        return found
+
+    async def insert(self, links: list[str]) -> None:
+        await self.db.exec_many_and_commit(
+            "INSERT OR IGNORE INTO seen_articles VALUES (?)", ((link,) for link in links)
+        )
+
+
+def create_seen_store(db: Database) -> SeenStore:
+    """Returns the store selected by the ``RSS_STORE`` setting.
+
+    :param db: Bot database, used by the SQLite backend
+    :return: SeenStore object
+    """
+    if rss_store == "mongo":
+        if not DB:
+            raise ValueError("'DB_URI' not set in .env file, it is required by RSS_STORE=mongo.")
+        return MongoSeenStore(DB)
+    if rss_store == "sqlite":
+        return SQLiteSeenStore(db)
+    raise ValueError(f"Unknown RSS_STORE {rss_store!r}, expected 'mongo' or 'sqlite'.")
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from bot.core.config import url_regex
+from bot.core.urls import canonicalize
+
+logger = logging.getLogger(__name__)
+
+
+def parse_single_page(text: str) -> tuple[list[str], frozenset[str]]:
+    return text.split("\n"), frozenset(canonicalize(link) for _, link in url_regex.findall(text))
+
+
+class WikiSnapshot:
+    """Latest good copy of the single page wiki, shared by every cog that reads it.
+
+    A failed refresh keeps serving the previous text and lines instead of raising. The set of
+    wiki URLs is extracted once per changed page, keyed by :func:`canonicalize`.
+    """
+
+    url = "https://api.fmhy.net/single-page"
+
+    def __init__(self, session: aiohttp.ClientSession, max_age: float = 300) -> None:
+        self.session = session
+        self.max_age = max_age
+        self.text = ""
+        self.lines: list[str] = []
+        self.urls: frozenset[str] = frozenset()
+        self.last_attempt = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.last_attempt >= self.max_age
+
+    async def refresh(self) -> bool:
+        """Downloads the single page and swaps it in.
+
+        :return: Whether the snapshot was updated
+        """
+        async with self._lock:
+            self.last_attempt = time.time()
+            try:
+                async with self.session.get(self.url) as response:
+                    response.raise_for_status()
+                    text = await response.text()
+            except (aiohttp.ClientError, TimeoutError) as exc:
+                logger.warning(f"Failed to refresh single page, serving last good copy: {exc}")
+                return False
+
+            if text != self.text:
+                lines, urls = await asyncio.to_thread(parse_single_page, text)
+                # Swapped together, without awaiting in between
+                self.text, self.lines, self.urls = text, lines, urls
+            logger.info("Updated single page cache.")
+            return True
+
+    async def get(self) -> "WikiSnapshot":
+        """Returns the snapshot, refreshing it first if it was last tried over ``max_age`` ago.
+
+        Concurrent callers wait for the same refresh instead of each starting their own.
+        """
+        if self.stale:
+            if self._lock.locked():
+                async with self._lock:
+                    pass
+            else:
+                await self.refresh()
+        return self
@@ -0,0 +1,118 @@
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset(
+    {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src"}
+)
+TRACKING_PREFIXES = ("utm_", "_ga")
+DEFAULT_PORTS = {80, 443}
+
+www_regex = re.compile(r"^ww(?:w|\d+)\.")
+
+
+def is_tracking_param(param: str) -> bool:
+    name = param.partition("=")[0]
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize(url: str) -> str:
+    """Returns the key two URLs pointing to the same page share.
+
+    The protocol, ``www.`` prefix, default port, fragment, trailing slashes and tracking
+    parameters are dropped, the remaining parameters are sorted and everything is lowercased.
+
+    :param url: URL, with or without protocol
+    :return: Canonical host+path(+query) key
+    """
+    url = url.lower()
+    try:
+        split = urlsplit(url if "://" in url else f"http://{url}")
+        port = split.port
+    except ValueError:  # Unparsable, still better than no key
+        return url
+
+    host = www_regex.sub("", split.hostname or "")
+    if port and port not in DEFAULT_PORTS:
+        host = f"{host}:{port}"
+    path = split.path.rstrip("/")
+    query = "&".join(
+        sorted(param for param in split.query.split("&") if param and not is_tracking_param(param))
+    )
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+@lru_cache(maxsize=4096)
+def url_key(link: tuple[str, str]) -> str:
+    """Cached :func:`canonicalize` for a ``url_regex`` match.
+
+    :param link: Protocol and host+path, as returned by ``url_regex``
+    :return: Canonical key
+    """
+    return canonicalize(link[1])
+
+
+class LinkIndex:
+    """Messages a link was posted in, keyed by :func:`url_key`.
+
+    Only the newest ``max_per_key`` messages are kept per link, enough to point at where it was
+    removed without letting a frequently reposted link grow its list forever. The keys each
+    message contributed are tracked too, so edited and deleted messages can be dropped.
+    """
+
+    def __init__(self, max_per_key: int = 5) -> None:
+        self.max_per_key = max_per_key
+        self.entries: dict[str, list[tuple[int, tuple[str, str], str]]] = {}
+        self.messages: dict[int, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, message_id: int, link: tuple[str, str], jump_url: str) -> bool:
+        """Records that the link was posted in the message.
+
+        :param message_id: Id of the message
+        :param link: Protocol and host+path, as returned by ``url_regex``
+        :param jump_url: Jump URL of the message
+        :return: Whether the entry was new
+        """
+        key = url_key(link)
+        entries = self.entries.setdefault(key, [])
+        entry = (message_id, link, jump_url)
+        if entry in entries:
+            return False
+        entries.append(entry)
+        self.messages.setdefault(message_id, set()).add(key)
+        if len(entries) > self.max_per_key:
+            evicted = entries.pop(0)[0]
+            if all(other[0] != evicted for other in entries):
+                self.forget(evicted, key)
+        return True
+
+    def forget(self, message_id: int, key: str) -> None:
+        keys = self.messages.get(message_id, set())
+        keys.discard(key)
+        if not keys:
+            self.messages.pop(message_id, None)
+
+    def remove(self, message_id: int) -> int:
+        """Drops every entry recorded for the message.
+
+        :param message_id: Id of the edited or deleted message
+        :return: Number of links that were removed
+        """
+        removed = 0
+        for key in self.messages.pop(message_id, ()):
+            entries = self.entries[key]
+            kept = [entry for entry in entries if entry[0] != message_id]
+            removed += len(entries) - len(kept)
+            if kept:
+                self.entries[key] = kept
+            else:
+                del self.entries[key]
+        return removed
+
+    def get(self, link: tuple[str, str]) -> list[tuple[int, tuple[str, str], str]]:
+        """Returns the ``(message_id, link, jump_url)`` entries recorded for the link, oldest first."""
+        return self.entries.get(url_key(link), [])
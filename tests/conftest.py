@@ -0,0 +1,12 @@
+import os
+
+# bot.core.config requires these at import time
+for variable, value in {
+    "TOKEN": "test",
+    "GUILD_ID": "1",
+    "OWNERS": "1",
+    "RSS_CHANNEL_IDS": "1",
+    "RSS_FEED_URLS": "http://localhost/feed",
+    "MKSWT_KEY": "test",
+}.items():
+    os.environ.setdefault(variable, value)
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bot.core.feeds import MIN_INTERVAL, FeedPoller
+from bot.core.seen import SeenStore
+
+FEEDS = Path(__file__).parent / "fixtures" / "feeds"
+
+
+class MemorySeenStore(SeenStore):
+    def __init__(self, links: tuple[str, ...] = ()) -> None:
+        super().__init__()
+        self.links = set(links)
+
+    async def lookup(self, links: list[str]) -> set[str]:
+        return self.links.intersection(links)
+
+    async def insert(self, links: list[str]) -> None:
+        self.links.update(links)
+
+
+class FeedServer:
+    """Serves fixture feeds by name, with an ETag per fixture and a status override per feed."""
+
+    def __init__(self) -> None:
+        self.fixtures: dict[str, str] = {}
+        self.statuses: dict[str, int] = {}
+        self.requests: list[tuple[str, str | None]] = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        self.requests.append((name, request.headers.get("If-None-Match")))
+        if status := self.statuses.get(name):
+            return web.Response(status=status)
+
+        etag = f'"{self.fixtures[name]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        body = (FEEDS / self.fixtures[name]).read_text(encoding="utf-8")
+        return web.Response(text=body, content_type="application/rss+xml", headers={"ETag": etag})
+
+    def requested(self, name: str) -> int:
+        return sum(1 for requested, _ in self.requests if requested == name)
+
+
+def run(
+    test: Callable[[FeedServer, aiohttp.ClientSession, Callable[[str], str]], Awaitable[None]],
+) -> None:
+    async def main() -> None:
+        feeds = FeedServer()
+        app = web.Application()
+        app.router.add_get("/{name}", feeds.handle)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            await test(feeds, session, lambda name: str(server.make_url(f"/{name}")))
+
+    asyncio.run(main())
+
+
+def links(articles) -> list[str]:
+    return [article.link for article in articles]
+
+
+def test_not_modified_feed_is_not_reparsed() -> None:
+    async def test(feeds, session, url) -> None:
+        feeds.fixtures["news"] = "news-1.xml"
+        poller = FeedPoller(session, MemorySeenStore(), [url("news")])
+        state = poller.states[url("news")]
+
+        assert links(await poller.poll()) == ["https://news.example/articles/3"]
+        state.next_poll = 0
+        assert await poller.poll() == []
+
+        assert feeds.requests == [("news", None), ("news", '"news-1.xml"')]
+        assert state.failures == 0
+        assert state.interval > MIN_INTERVAL
+        assert state.last_entry_id == "https://news.example/articles/3"
+
+    run(test)
+
+
+def test_new_entries_are_returned_oldest_first() -> None:
+    async def test(feeds, session, url) -> None:
+        feeds.fixtures["news"] = "news-1.xml"
+        poller = FeedPoller(session, MemorySeenStore(), [url("news")])
+        await poller.poll()
+
+        feeds.fixtures["news"] = "news-2.xml"
+        poller.states[url("news")].next_poll = 0
+        articles = await poller.poll()
+
+        assert links(articles) == [f"https://news.example/articles/{n}" for n in (4, 5, 6)]
+        assert articles[0].title.endswith("Article 4")
+
+    run(test)
+
+
+def test_first_poll_resumes_after_the_newest_posted_entry() -> None:
+    async def test(feeds, session, url) -> None:
+        feeds.fixtures["news"] = "news-2.xml"
+        posted = ("https://news.example/articles/1", "https://news.example/articles/2")
+        poller = FeedPoller(session, MemorySeenStore(posted), [url("news")])
+
+        assert links(await poller.poll()) == [
+            f"https://news.example/articles/{n}" for n in (3, 4, 5, 6)
+        ]
+
+    run(test)
+
+
+def test_failing_feed_backs_off_without_delaying_others() -> None:
+    async def test(feeds, session, url) -> None:
+        feeds.fixtures["news"] = "news-1.xml"
+        feeds.statuses["broken"] = 500
+        poller = FeedPoller(session, MemorySeenStore(), [url("broken"), url("news")])
+        broken, news = poller.states[url("broken")], poller.states[url("news")]
+
+        assert links(await poller.poll()) == ["https://news.example/articles/3"]
+        assert broken.failures == 1
+        assert broken.next_poll >= time.time() + MIN_INTERVAL
+        assert news.failures == 0
+
+        # Only the healthy feed is due again, the broken one waits out its backoff
+        feeds.fixtures["news"] = "news-2.xml"
+        news.next_poll = 0
+        assert len(await poller.poll()) == 3
+        assert feeds.requested("broken") == 1
+        assert feeds.requested("news") == 2
+
+        # Once due, the broken feed backs off further
+        broken.next_poll = 0
+        await poller.poll()
+        assert broken.failures == 2
+        assert broken.next_poll >= time.time() + MIN_INTERVAL * 3
+
+    run(test)
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+from bot.core.codenames.pool import RenderPool
+
+
+def test_cancelled_job_keeps_its_worker_until_the_thread_is_done() -> None:
+    async def main() -> None:
+        pool = RenderPool(workers=1)
+        release = threading.Event()
+        started: list[str] = []
+
+        def render(name: str) -> str:
+            started.append(name)
+            if name == "first":
+                release.wait(5)
+            return name
+
+        first = asyncio.create_task(pool.submit("field", render, "first"))
+        while not started:
+            await asyncio.sleep(0.01)
+        first.cancel()
+        second = asyncio.create_task(pool.submit("field", render, "second"))
+
+        # The first thread is still busy, so the second job must keep waiting for its slot
+        await asyncio.sleep(0.1)
+        assert started == ["first"]
+        assert pool.queue_depth() == 1
+
+        release.set()
+        assert await second == "second"
+        assert started == ["first", "second"]
+        assert first.cancelled()
+        pool.shutdown()
+
+    asyncio.run(main())
+
+
+def test_cancelled_queued_job_never_runs() -> None:
+    async def main() -> None:
+        pool = RenderPool(workers=1)
+        release = threading.Event()
+        started: list[str] = []
+
+        def render(name: str) -> str:
+            started.append(name)
+            if name == "first":
+                release.wait(5)
+            return name
+
+        first = asyncio.create_task(pool.submit("field", render, "first"))
+        queued = asyncio.create_task(pool.submit("field", render, "queued"))
+        await asyncio.sleep(0.1)
+        queued.cancel()
+        release.set()
+
+        assert await first == "first"
+        assert await pool.submit("field", render, "third") == "third"
+        assert started == ["first", "third"]
+        assert pool.stats["field"].calls == 2
+        pool.shutdown()
+
+    asyncio.run(main())
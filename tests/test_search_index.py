@@ -0,0 +1,118 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from bot.core import search_index
+from bot.core.search_help import (
+    filterLines,
+    filterOutNSFW,
+    getLinesThatContainAllWords,
+    parseWikiChunk,
+    wikiChunks,
+)
+from bot.core.search_index import SearchIndex
+
+WIKI = Path(__file__).parent / "fixtures" / "wiki"
+
+QUERIES = (
+    "anime",
+    "Anime Streaming",
+    "live tv",
+    "free vpn",
+    "youtube video",
+    "adblock dns",
+    "self-hosted",
+    "streaming",
+    "nothing matches this",
+    # Short and all-caps queries only keep full word matches
+    "tv",
+    "TV",
+    "AI",
+    "ai",
+    "VPN",
+    "DNS",
+    "Sub",
+)
+
+
+def chunk_index() -> SearchIndex:
+    chunks = {
+        fileName: list(
+            parseWikiChunk(
+                (WIKI / fileName).read_text(encoding="utf-8").split("\n"),
+                icon,
+                "https://fmhy.pages.dev/",
+                fileName.replace(".md", "").lower(),
+            )
+        )
+        for fileName, icon, _ in wikiChunks
+        if (WIKI / fileName).exists()
+    }
+    return SearchIndex.empty().updated(chunks)
+
+
+def single_page_index() -> SearchIndex:
+    lines = (WIKI / "single-page.md").read_text(encoding="utf-8").split("\n")
+    return SearchIndex.empty().updated({"single-page": lines})
+
+
+@pytest.fixture(params=[chunk_index, single_page_index], ids=["chunks", "single-page"])
+def index(request: pytest.FixtureRequest) -> SearchIndex:
+    return request.param()
+
+
+@pytest.mark.parametrize("nsfw", [False, True], ids=["sfw", "nsfw"])
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_filter_lines(index: SearchIndex, query: str, nsfw: bool) -> None:
+    matched = filterLines(index.lines, query)
+    expected = matched if nsfw else filterOutNSFW(matched)
+
+    results = index.search(query, nsfw)
+
+    assert sorted(results.lines) == sorted(line for line in expected if not line.startswith("#"))
+    assert results.titles == [line for line in matched if line.startswith("#")]
+
+
+def test_fixture_corpus_exercises_every_path() -> None:
+    chunks = chunk_index()
+    single_page = single_page_index()
+
+    assert len(chunks.partitions) > 1
+    assert any("nsfwpiracy" in line for line in chunks.lines)
+    assert any("nsfwpiracy" in line for line in single_page.lines)
+    assert single_page.search("streaming").titles
+    # The short query path must differ from plain substring matching on this corpus
+    assert filterLines(chunks.lines, "tv") != getLinesThatContainAllWords(chunks.lines, "tv")
+
+
+def test_search_is_deterministic(index: SearchIndex) -> None:
+    for query in QUERIES:
+        assert index.search(query) == index.search(query)
+
+
+def ranked_tools(index: SearchIndex, query: str) -> list[str]:
+    return [
+        re.search(r"\[([^\]]+)\]\(", line.partition(" ► ")[2])[1]
+        for line in index.search(query).lines
+    ]
+
+
+def test_heading_match_ranks_above_body_match(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = chunk_index()
+
+    # Quad9 is under the "DNS" heading, DNSCrypt only mentions DNS more often in its line
+    assert ranked_tools(index, "dns")[:2] == ["Quad9", "DNSCrypt"]
+
+    monkeypatch.setattr(search_index, "HEADING_BOOST", 1.0)
+    assert ranked_tools(index, "dns")[:2] == ["DNSCrypt", "Quad9"]
+
+
+def test_exact_phrase_ranks_above_scattered_words(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = chunk_index()
+
+    # VDownloader repeats "downloader" but never has "video downloader" as a phrase
+    assert ranked_tools(index, "video downloader") == ["yt-dlp", "VDownloader"]
+
+    monkeypatch.setattr(search_index, "PHRASE_BOOST", 1.0)
+    assert ranked_tools(index, "video downloader") == ["VDownloader", "yt-dlp"]
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from types import SimpleNamespace
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bot.cogs.wiki import INDEX_RETRY_INTERVAL, Wiki
+from bot.core.search_help import WikiFetcher, getAllChunks, wikiChunks
+from bot.core.snapshot import WikiSnapshot
+
+WIKI = Path(__file__).parent / "fixtures" / "wiki"
+CHUNKS = [fileName for fileName, _, _ in wikiChunks]
+NEW_LINE = "\n* [New Tool](https://new.example/)\n"
+LIST_OF_LISTS = ("https://lists.example", "https://more.example", "https://links.example")
+
+
+class WikiServer:
+    """Serves every wiki source by name, with optional ETags and a status override per file."""
+
+    def __init__(self, etags: bool = True) -> None:
+        self.etags = etags
+        self.bodies = {
+            fileName: (WIKI / fileName).read_text(encoding="utf-8")
+            if (WIKI / fileName).exists()
+            else f"# ► {fileName}\n\n* [Example](https://example.com/{fileName})\n"
+            for fileName in CHUNKS
+        }
+        self.bodies["single-page"] = (WIKI / "single-page.md").read_text(encoding="utf-8")
+        self.bodies["list-of-lists"] = "\n".join(LIST_OF_LISTS)
+        self.versions = dict.fromkeys(self.bodies, 1)
+        self.statuses: dict[str, int] = {}
+        self.requests: list[tuple[str, str | None]] = []
+
+    def change(self, fileName: str, body: str) -> None:
+        self.bodies[fileName] = body
+        self.versions[fileName] += 1
+
+    def fail(self, *fileNames: str, status: int = 500) -> None:
+        self.statuses.update(dict.fromkeys(fileNames, status))
+
+    async def handle(self, request: web.Request) -> web.Response:
+        fileName = request.match_info["name"]
+        self.requests.append((fileName, request.headers.get("If-None-Match")))
+        if status := self.statuses.get(fileName):
+            return web.Response(status=status)
+
+        headers = {}
+        if self.etags:
+            headers["ETag"] = f'"{fileName}-{self.versions[fileName]}"'
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return web.Response(status=304)
+        return web.Response(text=self.bodies[fileName], headers=headers)
+
+    def requested(self, fileName: str) -> int:
+        return sum(1 for requested, _ in self.requests if requested == fileName)
+
+
+def run(
+    test: Callable[[WikiServer, WikiFetcher, WikiSnapshot], Awaitable[None]], etags: bool = True
+) -> None:
+    async def main() -> None:
+        wiki = WikiServer(etags)
+        app = web.Application()
+        app.router.add_get("/{name}", wiki.handle)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            fetcher = WikiFetcher(session)
+            fetcher.rawBaseURL = str(server.make_url("/"))
+            snapshot = WikiSnapshot(session)
+            snapshot.url = str(server.make_url("/single-page"))
+            await test(wiki, fetcher, snapshot)
+
+    asyncio.run(main())
+
+
+def wiki_cog(fetcher: WikiFetcher, snapshot: WikiSnapshot) -> Wiki:
+    bot = SimpleNamespace(
+        session=fetcher.session, snapshot=snapshot, logger=logging.getLogger("bot")
+    )
+    cog = Wiki(bot)  # type: ignore
+    cog.fetcher = fetcher
+    cog.list_url = snapshot.url.replace("single-page", "list-of-lists")
+    return cog
+
+
+class FakeInteraction:
+    def __init__(self) -> None:
+        self.channel = None
+        self.response = SimpleNamespace(defer=self.defer)
+        self.followup = SimpleNamespace(send=self.send)
+        self.sent: list[dict] = []
+
+    async def defer(self) -> None:
+        pass
+
+    async def send(self, **kwargs) -> None:
+        self.sent.append(kwargs)
+
+
+def test_not_modified_chunks_are_not_rebuilt() -> None:
+    async def test(wiki, fetcher, _) -> None:
+        assert await fetcher.alternativeWikiIndexing() == CHUNKS
+        chunks = dict(fetcher.chunks)
+        wiki.requests.clear()
+
+        assert await fetcher.alternativeWikiIndexing() == []
+
+        assert sorted(wiki.requests) == sorted((name, f'"{name}-1"') for name in CHUNKS)
+        assert all(fetcher.chunks[name] is lines for name, lines in chunks.items())
+
+    run(test)
+
+
+def test_unchanged_body_keeps_the_parsed_chunk() -> None:
+    async def test(wiki, fetcher, _) -> None:
+        await fetcher.alternativeWikiIndexing()
+        chunks = dict(fetcher.chunks)
+        wiki.change("AI.md", wiki.bodies["AI.md"] + NEW_LINE)
+
+        assert await fetcher.alternativeWikiIndexing() == ["AI.md"]
+
+        assert fetcher.chunks["AI.md"] is not chunks["AI.md"]
+        assert str(fetcher.chunks["AI.md"][-1]).endswith("[New Tool](https://new.example/)")
+        assert all(
+            fetcher.chunks[name] is lines for name, lines in chunks.items() if name != "AI.md"
+        )
+
+    # Without validators every file comes back as 200, only the body hash tells them apart
+    run(test, etags=False)
+
+
+def test_failing_chunk_keeps_its_last_good_lines() -> None:
+    async def test(wiki, fetcher, _) -> None:
+        await fetcher.alternativeWikiIndexing()
+        chunks = dict(fetcher.chunks)
+        wiki.fail("AI.md")
+        wiki.change("STORAGE.md", wiki.bodies["STORAGE.md"] + NEW_LINE)
+
+        assert await fetcher.alternativeWikiIndexing() == ["STORAGE.md"]
+
+        assert fetcher.chunks["AI.md"] is chunks["AI.md"]
+        assert fetcher.chunks["STORAGE.md"] is not chunks["STORAGE.md"]
+        assert list(fetcher.orderedChunks()) == CHUNKS
+
+    run(test)
+
+
+def test_all_chunks_failing_keeps_every_chunk() -> None:
+    async def test(wiki, fetcher, snapshot) -> None:
+        chunks = await getAllChunks(fetcher, snapshot)
+        wiki.fail(*CHUNKS)
+
+        assert await getAllChunks(fetcher, snapshot) == chunks
+        assert wiki.requested("single-page") == 0
+
+    run(test)
+
+
+def test_cold_start_builds_the_chunks_that_loaded() -> None:
+    async def test(wiki, fetcher, snapshot) -> None:
+        wiki.fail("AI.md")
+
+        chunks = await getAllChunks(fetcher, snapshot)
+
+        assert list(chunks) == [name for name in CHUNKS if name != "AI.md"]
+
+    run(test)
+
+
+def test_cold_start_without_chunks_falls_back_to_the_single_page() -> None:
+    async def test(wiki, fetcher, snapshot) -> None:
+        wiki.fail(*CHUNKS)
+
+        chunks = await getAllChunks(fetcher, snapshot)
+
+        assert list(chunks) == ["single-page"]
+        assert chunks["single-page"] == wiki.bodies["single-page"].split("\n")
+
+    run(test)
+
+
+def test_failed_refresh_keeps_the_search_index() -> None:
+    async def test(wiki, fetcher, snapshot) -> None:
+        cog = wiki_cog(fetcher, snapshot)
+        await cog.refresh_index()
+        index = cog.index
+        assert len(index) > 0
+
+        wiki.fail(*CHUNKS)
+        await cog.refresh_index()
+
+        assert cog.index is index
+
+    run(test)
+
+
+def test_empty_index_retries_are_rate_limited() -> None:
+    async def test(wiki, fetcher, snapshot) -> None:
+        wiki.fail(*CHUNKS, "single-page")
+        cog = wiki_cog(fetcher, snapshot)
+
+        await Wiki.searchwiki.callback(cog, FakeInteraction(), "anime")  # type: ignore
+        await Wiki.searchwiki.callback(cog, FakeInteraction(), "anime")  # type: ignore
+        assert len(cog.index) == 0
+        assert wiki.requested("AI.md") == 1
+
+        # Once the retry interval passed, the next search tries again
+        cog.index_attempt = time.monotonic() - INDEX_RETRY_INTERVAL
+        wiki.statuses.clear()
+        await Wiki.searchwiki.callback(cog, FakeInteraction(), "anime")  # type: ignore
+        assert len(cog.index) > 0
+
+    run(test)
+
+
+def test_list_samples_at_most_the_cached_urls() -> None:
+    async def test(wiki, fetcher, snapshot) -> None:
+        cog = wiki_cog(fetcher, snapshot)
+        interaction = FakeInteraction()
+
+        await Wiki.list_links.callback(cog, interaction, 5)  # type: ignore
+
+        embed = interaction.sent[0]["embed"]
+        assert embed.title == "Here are 3 random URLs from the list of lists:"
+        assert sorted(embed.description.split("\n")) == sorted(LIST_OF_LISTS)
+
+    run(test)
+
+
+def test_list_without_cached_urls_sends_an_error() -> None:
+    async def test(wiki, fetcher, snapshot) -> None:
+        wiki.fail("list-of-lists")
+        cog = wiki_cog(fetcher, snapshot)
+        interaction = FakeInteraction()
+
+        await Wiki.list_links.callback(cog, interaction, 5)  # type: ignore
+
+        assert wiki.requested("list-of-lists") == 1
+        assert interaction.sent[0]["embed"].title == ":warning: The list of lists is unavailable"
+
+    run(test)